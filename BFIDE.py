@@ -1,37 +1,468 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk, scrolledtext
+import re
+import time
+from functools import lru_cache
+from array import array
+from bisect import bisect_right
 # import threading # Removed threading import
 
 BF_COMMANDS = "><+-.,[]"
 
+# --- Tape ---
+# The tape is a bytearray for 8-bit cells and an array for 16/32-bit cells. It starts
+# at TAPE_SIZE cells and grows (doubling) when the pointer moves past the end.
+TAPE_SIZE = 30000
+CELL_BITS = (8, 16, 32)
+
+def new_tape(size=TAPE_SIZE, cell_bits=8):
+    """Returns a zeroed tape of `size` cells, `cell_bits` wide."""
+    if cell_bits == 8:
+        return bytearray(size)
+    for typecode in "HILQ":
+        if array(typecode).itemsize * 8 == cell_bits:
+            return array(typecode, bytes(size * array(typecode).itemsize))
+    raise ValueError(f"Unsupported cell width: {cell_bits} bits")
+
+def grow_tape(cells, index):
+    """Extends the tape in place so `index` is a valid cell. Returns the new length."""
+    size = len(cells)
+    new_size = max(size * 2, index + 1)
+    if isinstance(cells, bytearray):
+        cells.extend(bytes(new_size - size))
+    else:
+        cells.frombytes(bytes((new_size - size) * cells.itemsize))
+    return new_size
+
+# --- Optimizing compiler ---
+# Brainfuck is compiled into a list of IR ops: (op, arg, pos), where pos is the index
+# in the command list where the op starts (so a run can resume after single steps).
+#   OP_ADD n        cell += n (runs of +/- folded)
+#   OP_MOVE n       ptr += n (runs of </> folded)
+#   OP_OPEN i       '[': jump past op i (its OP_CLOSE) when the cell is 0
+#   OP_CLOSE i      ']': jump back to just after op i when the cell isn't 0
+#   OP_CLEAR d      [-] (d = -1) / [+] (d = 1)
+#   OP_MULADD ((offset, factor), ...)   move/copy loops like [->+>++<<]
+#   OP_SCAN step    [>] / [<<]: move until a zero cell
+#   OP_OUT, OP_IN   '.' and ','
+# Loops that can never run (at program start, or right after another loop) are dropped.
+# Additions are folded modulo the cell size, so ops are compiled for a cell width.
+OP_ADD, OP_MOVE, OP_OPEN, OP_CLOSE, OP_CLEAR, OP_MULADD, OP_SCAN, OP_OUT, OP_IN = range(9)
+
+def build_bracket_map(code):
+    """Maps each '[' to its ']' and back. Raises SyntaxError on unmatched brackets."""
+    stack = []
+    map = {}
+    for pos, cmd in enumerate(code):
+        if cmd == '[':
+            stack.append(pos)
+        elif cmd == ']':
+            if not stack:
+                raise SyntaxError("Unmatched ']' at position {}".format(pos))
+            start = stack.pop()
+            map[start] = pos
+            map[pos] = start
+    if stack:
+        raise SyntaxError("Unmatched '[' at position {}".format(stack.pop()))
+    return map
+
+def _fold_loop(body, pos, modulus):
+    """Returns the single op replacing a loop with this body, or None if it isn't an idiom."""
+    if len(body) == 1 and body[0][0] == OP_MOVE:
+        return (OP_SCAN, body[0][1], pos)
+    offset = 0
+    deltas = {}
+    for op, arg, _ in body:
+        if op == OP_MOVE:
+            offset += arg
+        elif op == OP_ADD:
+            deltas[offset] = (deltas.get(offset, 0) + arg) % modulus
+        else:
+            return None
+    if offset != 0 or deltas.get(0) not in (1, modulus - 1):
+        return None
+    factors = tuple(sorted((off, factor) for off, factor in deltas.items() if off != 0 and factor))
+    if not factors:
+        return (OP_CLEAR, 1 if deltas[0] == 1 else -1, pos) # Keep the direction for brainfuck_from_ops
+    if deltas[0] != modulus - 1:
+        return None # [+>+<] counts up to the wrap; leave it as a loop
+    return (OP_MULADD, factors, pos)
+
+def compile_brainfuck(code, cell_bits=8):
+    """Compiles Brainfuck source (any string; non-commands are ignored) into IR ops."""
+    modulus = 1 << cell_bits
+    commands = [c for c in code if c in BF_COMMANDS]
+    bracket_map = build_bracket_map(commands)
+    ops = []
+    open_loops = [] # Indexes of the OP_OPEN ops of the loops we're in
+    i = 0
+    while i < len(commands):
+        cmd = commands[i]
+        start = i
+        if cmd in '+-':
+            total = 0
+            while i < len(commands) and commands[i] in '+-':
+                total += 1 if commands[i] == '+' else -1
+                i += 1
+            total %= modulus
+            if total:
+                ops.append((OP_ADD, total, start))
+            continue
+        if cmd in '<>':
+            total = 0
+            while i < len(commands) and commands[i] in '<>':
+                total += 1 if commands[i] == '>' else -1
+                i += 1
+            if total:
+                ops.append((OP_MOVE, total, start))
+            continue
+        i += 1
+        if cmd == '.':
+            ops.append((OP_OUT, None, start))
+        elif cmd == ',':
+            ops.append((OP_IN, None, start))
+        elif cmd == '[':
+            if not ops or ops[-1] is not None and ops[-1][0] in (OP_CLOSE, OP_CLEAR, OP_MULADD, OP_SCAN):
+                i = bracket_map[start] + 1 # The cell is known to be 0: dead loop
+                continue
+            open_loops.append(len(ops))
+            ops.append(None) # Filled in at the matching ']'
+        else: # ']'
+            open_index = open_loops.pop()
+            open_pos = bracket_map[start]
+            folded = _fold_loop(ops[open_index + 1:], open_pos, modulus)
+            if folded:
+                del ops[open_index:]
+                ops.append(folded)
+            else:
+                ops[open_index] = (OP_OPEN, len(ops), open_pos)
+                ops.append((OP_CLOSE, open_index, start))
+    return ops
+
+def _moves(step):
+    return '>' * step if step > 0 else '<' * -step
+
+def _adds(amount, modulus):
+    return '+' * amount if amount <= modulus // 2 else '-' * (modulus - amount)
+
+def brainfuck_from_ops(ops, cell_bits=8):
+    """Writes IR ops back out as (equivalent, shorter) Brainfuck source."""
+    modulus = 1 << cell_bits
+    parts = []
+    for op, arg, _ in ops:
+        if op == OP_ADD:
+            parts.append(_adds(arg, modulus))
+        elif op == OP_MOVE:
+            parts.append(_moves(arg))
+        elif op == OP_OPEN:
+            parts.append('[')
+        elif op == OP_CLOSE:
+            parts.append(']')
+        elif op == OP_CLEAR:
+            parts.append('[+]' if arg == 1 else '[-]')
+        elif op == OP_SCAN:
+            parts.append('[' + _moves(arg) + ']')
+        elif op == OP_MULADD:
+            loop = ['[-']
+            offset = 0
+            for target, factor in arg:
+                loop.append(_moves(target - offset))
+                loop.append(_adds(factor, modulus))
+                offset = target
+            loop.append(_moves(-offset) + ']')
+            parts.append(''.join(loop))
+        elif op == OP_OUT:
+            parts.append('.')
+        else:
+            parts.append(',')
+    return ''.join(parts)
+
+# --- Python code generation ---
+# For full runs the ops are turned into Python source (nested while loops over the
+# tape, pointer moves folded into index offsets) and compiled once per program.
+# The tape is grown whenever ptr passes `limit`, which keeps `margin` cells spare
+# beyond ptr: enough for every offset the program reads or writes.
+# A sliced program is a generator instead, so the IDE can run it a slice at a time: it
+# counts loop iterations down from `budget` and yields (ptr, input_pos) when that hits
+# 0, then carries on with the budget sent in. Its return value is the final (ptr, input_pos).
+COMPILED_PROGRAM_CACHE_SIZE = 32
+
+def python_from_ops(ops, cell_bits=8, sliced=False):
+    """
+    Generates the source of
+    bf_program(cells, ptr, input_data, input_pos, output) -> (ptr, input_pos) for the ops,
+    or with sliced=True of the generator bf_program(cells, ptr, input_data, input_pos, output, budget).
+    """
+    modulus = 1 << cell_bits
+    lines = []
+    indent = "    "
+    offset = 0 # Pointer moves not yet applied to ptr
+    margin = 1 # Cells needed past ptr
+
+    def signed(n):
+        return f"+ {n}" if n > 0 else f"- {-n}"
+
+    def cell(extra=0):
+        nonlocal margin
+        margin = max(margin, offset + extra + 1)
+        return f"cells[ptr {signed(offset + extra)}]" if offset + extra else "cells[ptr]"
+
+    def move_pointer(step, at_indent):
+        lines.append(f"{at_indent}ptr {signed(step)[0]}= {abs(step)}")
+        if step > 0:
+            lines.append(f"{at_indent}if ptr >= limit:")
+            lines.append(f"{at_indent}    limit = grow_tape(cells, ptr + margin) - margin")
+
+    def apply_offset():
+        nonlocal offset
+        if offset:
+            move_pointer(offset, indent)
+            offset = 0
+
+    def count_iteration(at_indent):
+        lines.append(f"{at_indent}budget -= 1")
+        lines.append(f"{at_indent}if not budget:")
+        lines.append(f"{at_indent}    budget = yield ptr, input_pos")
+
+    for op, arg, _ in ops:
+        if op == OP_ADD:
+            lines.append(f"{indent}{cell()} = ({cell()} + {arg}) % {modulus}")
+        elif op == OP_MOVE:
+            offset += arg
+        elif op == OP_OPEN:
+            apply_offset()
+            lines.append(f"{indent}while cells[ptr]:")
+            indent += "    "
+        elif op == OP_CLOSE:
+            apply_offset()
+            if sliced:
+                count_iteration(indent)
+            elif lines[-1].endswith(":"):
+                lines.append(f"{indent}pass") # Empty loop body, e.g. [+-]
+            indent = indent[:-4]
+        elif op == OP_CLEAR:
+            lines.append(f"{indent}{cell()} = 0")
+        elif op == OP_MULADD:
+            lines.append(f"{indent}value = {cell()}")
+            lines.append(f"{indent}if value:")
+            for target, factor in arg:
+                product = "value" if factor == 1 else f"value * {factor}"
+                lines.append(f"{indent}    {cell(target)} = ({cell(target)} + {product}) % {modulus}")
+            lines.append(f"{indent}    {cell()} = 0")
+        elif op == OP_SCAN:
+            apply_offset()
+            lines.append(f"{indent}while cells[ptr]:")
+            move_pointer(arg, indent + "    ")
+            if sliced:
+                count_iteration(indent + "    ")
+        elif op == OP_OUT:
+            lines.append(f"{indent}write(chr({cell()}))")
+        else: # OP_IN
+            lines.append(f"{indent}if input_pos < input_size:")
+            lines.append(f"{indent}    {cell()} = ord(input_data[input_pos]) % {modulus}")
+            lines.append(f"{indent}    input_pos += 1")
+            lines.append(f"{indent}else:")
+            lines.append(f"{indent}    {cell()} = 0")
+    apply_offset()
+    if sliced and not any(line.endswith("yield ptr, input_pos") for line in lines):
+        lines.append("    yield from ()") # No loops: still a generator
+    parameters = "cells, ptr, input_data, input_pos, output, budget" if sliced else "cells, ptr, input_data, input_pos, output"
+    header = [f"def bf_program({parameters}, margin={margin}):",
+              "    write = output.append",
+              "    input_size = len(input_data)",
+              "    limit = len(cells) - margin",
+              "    if ptr >= limit:",
+              "        limit = grow_tape(cells, ptr + margin) - margin"]
+    return "\n".join(header + lines + ["    return ptr, input_pos"]) + "\n"
+
+@lru_cache(maxsize=COMPILED_PROGRAM_CACHE_SIZE)
+def compile_python(program, cell_bits=8, sliced=False):
+    """
+    Returns the compiled bf_program function for a program (a string of BF commands),
+    or None when Python can't compile it (e.g. more than 20 nested loops).
+    """
+    source = python_from_ops(compile_brainfuck(program, cell_bits), cell_bits, sliced)
+    try:
+        code_object = compile(source, "<brainfuck>", "exec")
+    except (SyntaxError, RecursionError, MemoryError):
+        return None
+    namespace = {"grow_tape": grow_tape}
+    exec(code_object, namespace)
+    return namespace["bf_program"]
+
+# --- Execution history ---
+# For stepping backwards, a run records a checkpoint at least every `interval` steps
+# (one step = one Brainfuck command, as executed by step()). A checkpoint keeps the
+# registers and the TAPE_BLOCK-byte tape blocks that changed since the previous one,
+# with a full copy of the tape every KEYFRAME_EVERY checkpoints. Seeking restores the
+# nearest checkpoint at or before the target and steps forward from there, so going
+# back costs at most about `interval` steps and memory grows with what a run changes.
+CHECKPOINT_INTERVAL = 100000
+TAPE_BLOCK = 256
+KEYFRAME_EVERY = 64
+SEEK_OPS_PER_RUN = 10000 # Ops per run_ops() call when seeking past the furthest step reached
+
+class ExecutionHistory:
+    def __init__(self, interval=CHECKPOINT_INTERVAL):
+        self.interval = interval
+        self.steps = [] # Step count of each checkpoint, ascending: the index used to seek
+        self.checkpoints = [] # (pc, ptr, input_pos, output_length, tape_length, tape data)
+        self.previous_tape = b''
+        self.next_step = 0 # Step count at which the next checkpoint is due
+        self.frontier = 0 # Furthest step reached; seeking can't go past it
+        self.output = '' # Output up to the frontier, for seeking forward again after going back
+
+    def record(self, interpreter, output_length):
+        """Adds a checkpoint of the interpreter's current state."""
+        tape = bytes(interpreter.cells)
+        if len(self.checkpoints) % KEYFRAME_EVERY == 0:
+            data = tape # Keyframe: the whole tape
+        else:
+            previous = self.previous_tape
+            data = {}
+            for start in range(0, len(tape), TAPE_BLOCK):
+                block = tape[start:start + TAPE_BLOCK]
+                if block != previous[start:start + TAPE_BLOCK]:
+                    data[start] = block
+        self.previous_tape = tape
+        self.steps.append(interpreter.steps)
+        self.checkpoints.append((interpreter.pc, interpreter.ptr, interpreter.input_pos, output_length, len(tape), data))
+        self.next_step = interpreter.steps + self.interval # Not reset by restore(): replays never re-record
+        self.frontier = max(self.frontier, interpreter.steps)
+
+    def restore(self, interpreter, target_step):
+        """Puts the interpreter in the state of the last checkpoint at or before target_step."""
+        index = max(bisect_right(self.steps, target_step) - 1, 0)
+        keyframe = index - index % KEYFRAME_EVERY
+        tape = bytearray(self.checkpoints[keyframe][5])
+        for pc, ptr, input_pos, output_length, tape_length, data in self.checkpoints[keyframe + 1:index + 1]:
+            if len(tape) < tape_length:
+                tape.extend(bytes(tape_length - len(tape)))
+            for start, block in data.items():
+                tape[start:start + len(block)] = block
+        pc, ptr, input_pos, output_length, tape_length, _ = self.checkpoints[index]
+
+        if isinstance(interpreter.cells, bytearray):
+            interpreter.cells = tape
+        else:
+            cells = array(interpreter.cells.typecode)
+            cells.frombytes(tape)
+            interpreter.cells = cells
+        interpreter.pc = pc
+        interpreter.ptr = ptr
+        interpreter.input_pos = input_pos
+        output = interpreter.output
+        if len(output) > len(self.output): # Runs only ever append, so the longest output holds all the others
+            self.output = output
+        interpreter.output_chunks = [self.output[:output_length]]
+        interpreter.steps = self.steps[index]
+        interpreter.running = pc < len(interpreter.code)
+
 class BrainfuckInterpreter:
-    def __init__(self, code, input_data=''):
+    def __init__(self, code, input_data='', cell_bits=8, tape_size=TAPE_SIZE):
         self.code = [c for c in code if c in BF_COMMANDS]
-        self.input_data = list(input_data)
-        self.input_data.reverse()
-        self.output = ''
-        self.cells = [0] * 30000
+        self.input_data = input_data
+        self.input_pos = 0 # Next character of input_data that ',' reads
+        self.output_chunks = [] # Joined lazily by the output property
+        self.cell_bits = cell_bits
+        self.cell_modulus = 1 << cell_bits
+        self.cells = new_tape(tape_size, cell_bits)
         self.ptr = 0
         self.pc = 0
         self.bracket_map = self.build_bracket_map()
+        self.ops = compile_brainfuck(self.code, cell_bits)
+        self.op_starts = {op[2]: index for index, op in enumerate(self.ops)}
         self.running = True
+        self.steps = 0 # Commands executed so far (kept exact by step() and run_ops())
+        self.history = None # ExecutionHistory once enable_history() is called
+        self.compiled_run = None # Generator of a sliced generated-Python run (see run_compiled)
+
+    @property
+    def output(self):
+        chunks = self.output_chunks
+        if len(chunks) > 1:
+            chunks[:] = [''.join(chunks)]
+        return chunks[0] if chunks else ''
 
     def build_bracket_map(self):
-        stack = []
-        map = {}
-        for pos, cmd in enumerate(self.code):
-            if cmd == '[':
-                stack.append(pos)
-            elif cmd == ']':
-                if not stack:
-                    raise SyntaxError("Unmatched ']' at position {}".format(pos))
-                start = stack.pop()
-                map[start] = pos
-                map[pos] = start
-        if stack:
-            raise SyntaxError("Unmatched '[' at position {}".format(stack.pop()))
-        return map
+        return build_bracket_map(self.code)
+
+    # --- History ---
+    def enable_history(self, interval=CHECKPOINT_INTERVAL):
+        """Starts recording checkpoints (see ExecutionHistory), beginning with the current state."""
+        self._compute_step_costs()
+        self.history = ExecutionHistory(interval)
+        self.history.record(self, len(self.output))
+
+    def seek(self, target_step):
+        """
+        Moves to the state after `target_step` steps, forwards or backwards. Steps past the
+        furthest one reached are run first (the program may end before). Returns the step
+        it arrived at.
+        """
+        history = self.history
+        if history is None:
+            raise RuntimeError("History is not enabled (call enable_history() first)")
+        target_step = max(0, target_step)
+        if target_step > history.frontier:
+            self.seek(history.frontier)
+            while self.steps < target_step and self.run_ops(SEEK_OPS_PER_RUN) == "paused":
+                pass
+            target_step = min(target_step, history.frontier)
+        history.restore(self, target_step)
+        while self.steps < target_step and self.running and self.pc < len(self.code):
+            self.step()
+        return self.steps
+
+    def step_back(self, count=1):
+        return self.seek(self.steps - count)
+
+    def _gap_steps(self, start, stop):
+        """Steps taken by commands start..stop-1 that have no op (cancelled runs, dead loops)."""
+        steps = 0
+        position = start
+        while position < stop:
+            steps += 1
+            position = self.bracket_map[position] + 1 if self.code[position] == '[' else position + 1
+        return steps
+
+    def _compute_step_costs(self):
+        """
+        Works out how many steps each op stands for, so run_ops() can keep self.steps exact:
+        op_costs[i] is the step count of op i (None for folded loops, which take
+        1 + iterations * loop_iteration_steps[i]), and op_gaps[i] the steps of the commands
+        before op i that have no op of their own (op_gaps[-1] covers the end of the program).
+        """
+        code = self.code
+        self.op_costs = []
+        self.op_gaps = []
+        self.loop_iteration_steps = {}
+        self.loop_counts_down = {} # Folded loops that decrement the loop cell (CLEAR may count up)
+        previous_end = 0
+        for index, (op, arg, pos) in enumerate(self.ops):
+            self.op_gaps.append(self._gap_steps(previous_end, pos))
+            if op == OP_ADD or op == OP_MOVE:
+                run = '+-' if op == OP_ADD else '<>'
+                end = pos
+                while end < len(code) and code[end] in run:
+                    end += 1
+                self.op_costs.append(end - pos)
+            elif op in (OP_CLEAR, OP_MULADD, OP_SCAN):
+                end = self.bracket_map[pos] + 1
+                self.op_costs.append(None)
+                self.loop_iteration_steps[index] = end - pos - 1 # Body plus ']'
+                offset = delta = 0
+                for cmd in code[pos + 1:end - 1]:
+                    offset += (cmd == '>') - (cmd == '<')
+                    if offset == 0:
+                        delta += (cmd == '+') - (cmd == '-')
+                self.loop_counts_down[index] = delta % self.cell_modulus == self.cell_modulus - 1
+            else:
+                end = pos + 1
+                self.op_costs.append(1)
+            previous_end = end
+        self.op_gaps.append(self._gap_steps(previous_end, len(code)))
 
     def step(self):
         if not self.running or self.pc >= len(self.code):
@@ -41,16 +472,22 @@ class BrainfuckInterpreter:
         cmd = self.code[self.pc]
         if cmd == '>':
             self.ptr += 1
+            if self.ptr >= len(self.cells):
+                grow_tape(self.cells, self.ptr)
         elif cmd == '<':
             self.ptr -= 1
         elif cmd == '+':
-            self.cells[self.ptr] = (self.cells[self.ptr] + 1) % 256
+            self.cells[self.ptr] = (self.cells[self.ptr] + 1) % self.cell_modulus
         elif cmd == '-':
-            self.cells[self.ptr] = (self.cells[self.ptr] - 1) % 256
+            self.cells[self.ptr] = (self.cells[self.ptr] - 1) % self.cell_modulus
         elif cmd == '.':
-            self.output += chr(self.cells[self.ptr])
+            self.output_chunks.append(chr(self.cells[self.ptr]))
         elif cmd == ',':
-            self.cells[self.ptr] = ord(self.input_data.pop()) if self.input_data else 0
+            if self.input_pos < len(self.input_data):
+                self.cells[self.ptr] = ord(self.input_data[self.input_pos]) % self.cell_modulus
+                self.input_pos += 1
+            else:
+                self.cells[self.ptr] = 0
         elif cmd == '[':
             if self.cells[self.ptr] == 0:
                 self.pc = self.bracket_map[self.pc]
@@ -59,14 +496,216 @@ class BrainfuckInterpreter:
                 self.pc = self.bracket_map[self.pc]
 
         self.pc += 1
+        self.steps += 1
+        history = self.history
+        if history is not None:
+            if self.steps > history.frontier:
+                history.frontier = self.steps
+            if self.steps >= history.next_step:
+                history.record(self, len(self.output))
         return self.cells, self.ptr, self.output
 
     def run_all(self):
-        """Runs the Brainfuck code to completion (synchronously)."""
-        while self.running and self.pc < len(self.code):
-            self.step()
+        """
+        Runs the Brainfuck code to completion (synchronously). A fresh program runs as
+        generated Python (see compile_python); after single steps, or if that fails,
+        it runs on the compiled ops.
+        """
+        if self.pc == 0 and self.running and self.history is None: # The generated code doesn't count steps
+            bf_program = compile_python(''.join(self.code), self.cell_bits)
+            if bf_program is not None:
+                cells = self.cells[:]
+                output = []
+                try:
+                    ptr, input_pos = bf_program(cells, self.ptr, self.input_data, self.input_pos, output)
+                except Exception:
+                    pass # Replayed on the ops below, which leave the exact state at the error
+                else:
+                    self.cells = cells
+                    self.ptr = ptr
+                    self.input_pos = input_pos
+                    self.output_chunks.extend(output)
+                    self.pc = len(self.code)
+                    self.running = False
+                    return self.output
+        self.run_ops()
         return self.output
 
+    def run_compiled(self, max_iterations=None):
+        """
+        Runs a fresh program as sliced generated Python: each call goes on until the program
+        ends or `max_iterations` loop iterations have run, and returns "finished" or "paused"
+        like run_ops(). Steps aren't counted. Returns None if the program can't run this way
+        (it has been stepped, history is on, or Python can't compile it): use run_ops() then.
+        """
+        budget = max_iterations if max_iterations else -1 # -1 never counts down to 0
+        try:
+            if self.compiled_run is None:
+                if self.pc != 0 or not self.running or self.history is not None:
+                    return None
+                bf_program = compile_python(''.join(self.code), self.cell_bits, sliced=True)
+                if bf_program is None:
+                    return None
+                # The tape grows in place and output goes straight to output_chunks
+                self.compiled_run = bf_program(self.cells, self.ptr, self.input_data, self.input_pos, self.output_chunks, budget)
+                self.ptr, self.input_pos = next(self.compiled_run)
+            else:
+                self.ptr, self.input_pos = self.compiled_run.send(budget)
+        except StopIteration as finished:
+            self.ptr, self.input_pos = finished.value
+            self.compiled_run = None
+            self.pc = len(self.code)
+            self.running = False
+            return "finished"
+        except Exception:
+            self.stop_compiled_run()
+            raise
+        return "paused"
+
+    def stop_compiled_run(self):
+        """Ends a paused run_compiled() run where it is; it can't be continued by steps or ops."""
+        if self.compiled_run is not None:
+            self.compiled_run.close()
+            self.compiled_run = None
+            self.running = False
+
+    def breakpoint_ops(self, positions):
+        """Maps command positions (indexes into self.code) to the indexes of the ops containing them."""
+        starts = [op[2] for op in self.ops] # Ops are in program order, so this is sorted
+        indexes = set()
+        for position in positions:
+            index = bisect_right(starts, position) - 1
+            if index >= 0:
+                indexes.add(index)
+        return indexes
+
+    def run_ops(self, max_ops=None, breakpoints=()):
+        """
+        Runs the compiled ops until the program ends, `max_ops` ops have run, or an op
+        in `breakpoints` (op indexes, see breakpoint_ops) is next; the op the run starts
+        on never stops it. Returns "finished", "paused" or "breakpoint".
+        """
+        # After single steps pc may be in the middle of an op: step until one starts
+        while self.running and self.pc < len(self.code) and self.pc not in self.op_starts:
+            self.step()
+        if not self.running or self.pc >= len(self.code):
+            self.running = False
+            return "finished"
+
+        ops = self.ops
+        end = len(ops)
+        index = self.op_starts[self.pc]
+        cells = self.cells
+        size = len(cells)
+        modulus = self.cell_modulus
+        ptr = self.ptr
+        input_data = self.input_data
+        input_pos = self.input_pos
+        write = self.output_chunks.append
+        budget = max_ops if max_ops else -1 # Counts down; -1 never reaches 0, so it runs to the end
+        stopped = None
+        history = self.history
+        counting = history is not None # Only runs with history keep self.steps up to date
+        if counting:
+            steps = self.steps
+            output_length = len(self.output)
+            op_costs = self.op_costs
+            op_gaps = self.op_gaps
+            loop_iteration_steps = self.loop_iteration_steps
+        try:
+            while index < end:
+                op, arg, _ = ops[index]
+                if counting:
+                    cost = op_costs[index]
+                    if cost is None: # Folded loop: '[' plus one pass of the body and ']' per iteration
+                        value = cells[ptr]
+                        if op == OP_SCAN or not value:
+                            cost = 1 # A scan's iterations are added once it has run
+                        elif self.loop_counts_down[index]:
+                            cost = 1 + value * loop_iteration_steps[index]
+                        else:
+                            cost = 1 + (modulus - value) * loop_iteration_steps[index]
+                    steps += cost
+                if op == OP_ADD:
+                    cells[ptr] = (cells[ptr] + arg) % modulus
+                elif op == OP_MOVE:
+                    ptr += arg
+                    if ptr >= size:
+                        size = grow_tape(cells, ptr)
+                elif op == OP_OPEN:
+                    if not cells[ptr]:
+                        index = arg
+                elif op == OP_CLOSE:
+                    if cells[ptr]:
+                        index = arg
+                elif op == OP_CLEAR:
+                    cells[ptr] = 0
+                elif op == OP_MULADD:
+                    value = cells[ptr]
+                    if value:
+                        if ptr + arg[-1][0] >= size: # Offsets are sorted, the last is the furthest right
+                            size = grow_tape(cells, ptr + arg[-1][0])
+                        for offset, factor in arg:
+                            cells[ptr + offset] = (cells[ptr + offset] + value * factor) % modulus
+                        cells[ptr] = 0
+                elif op == OP_SCAN:
+                    start = ptr
+                    while cells[ptr]:
+                        ptr += arg
+                        if ptr >= size:
+                            size = grow_tape(cells, ptr)
+                    if counting:
+                        steps += (ptr - start) // arg * loop_iteration_steps[index]
+                elif op == OP_OUT:
+                    write(chr(cells[ptr]))
+                else: # OP_IN
+                    if input_pos < len(input_data):
+                        cells[ptr] = ord(input_data[input_pos]) % modulus
+                        input_pos += 1
+                    else:
+                        cells[ptr] = 0
+                index += 1
+                if counting:
+                    steps += op_gaps[index]
+                    if op == OP_OUT:
+                        output_length += 1
+                    if steps >= history.next_step:
+                        self.ptr = ptr
+                        self.input_pos = input_pos
+                        self.pc = ops[index][2] if index < end else len(self.code)
+                        self.steps = steps
+                        history.record(self, output_length)
+                if index in breakpoints: # Checked first: a paused run resumes past the op it stops on
+                    stopped = "breakpoint"
+                    break
+                budget -= 1
+                if not budget:
+                    stopped = "paused"
+                    break
+        finally:
+            self.ptr = ptr
+            self.input_pos = input_pos
+            self.pc = ops[index][2] if index < end else len(self.code)
+            if counting:
+                self.steps = steps
+                history.frontier = max(history.frontier, steps)
+        if stopped and index < end:
+            return stopped
+        self.running = False
+        return "finished"
+
+
+# --- IDE ---
+STEPS_PER_FRAME = 20000 # Default ops (loop iterations for generated Python) per after() slice of a background run
+UI_REFRESH_INTERVAL = 0.1 # Seconds between tape/output refreshes while running
+TAPE_WINDOW = 20 # Cells shown in the memory tape
+
+# Syntax highlighting: each run of same-kind commands gets one tag range
+SYNTAX_TAGS = {"gtlt": "blue", "plusminus": "lime green", "brackets": "orange", "dot": "cyan", "comma": "magenta"}
+SYNTAX_TAG_FOR = {'>': "gtlt", '<': "gtlt", '+': "plusminus", '-': "plusminus",
+                  '[': "brackets", ']': "brackets", '.': "dot", ',': "comma"}
+SYNTAX_RUN_PATTERN = re.compile(r"[<>]+|[+-]+|[\[\]]+|\.+|,+")
+TAG_RANGES_PER_CALL = 5000 # Ranges passed to a single tag_add call
 
 class BrainfuckIDE(tk.Tk):
     def __init__(self):
@@ -93,7 +732,15 @@ class BrainfuckIDE(tk.Tk):
                                                  bg="#1e1e1e", fg="white", insertbackground="white",
                                                  wrap=tk.NONE) # Added wrap=tk.NONE for better code display
         self.editor.pack(side="left", fill="both", expand=True) # Pack to the left, expanding
-        self.editor.bind("<KeyRelease>", self.highlight_syntax)
+        self.editor.bind("<KeyPress>", self.remember_edit_line)
+        self.editor.bind("<KeyRelease>", self.highlight_edit)
+        for virtual_event in ("<<Paste>>", "<<Cut>>", "<<Undo>>", "<<Redo>>"):
+            # These can change text away from the cursor: re-highlight everything once they're done
+            self.editor.bind(virtual_event, lambda event: self.after_idle(self.highlight_syntax), add="+")
+        for tag, color in SYNTAX_TAGS.items():
+            self.editor.tag_config(tag, foreground=color)
+        self.edit_start_line = 1 # Cursor line when the last key went down
+        self.line_number_items = [] # Canvas text items, reused for the visible line numbers
         
         # Bind scrolling to update line numbers
         self.editor.bind("<MouseWheel>", self.update_line_numbers_scroll)
@@ -101,6 +748,7 @@ class BrainfuckIDE(tk.Tk):
         self.editor.bind("<Button-5>", self.update_line_numbers_scroll) # Linux scroll down
         self.editor.vbar.config(command=self.editor.yview) # Ensure editor's scrollbar updates line numbers
         self.editor.config(yscrollcommand=self.on_editor_scroll)
+        self.line_number_canvas.bind("<Button-1>", self.toggle_breakpoint) # Click a line number for a breakpoint
 
 
         # --- Controls Frame ---
@@ -111,12 +759,23 @@ class BrainfuckIDE(tk.Tk):
         self.input_entry = tk.Entry(control_frame, width=20, bg="#2d2d2d", fg="white", insertbackground="white")
         self.input_entry.pack(side="left", padx=5)
 
-        # Reverted Run button command to synchronous run_code
         self.run_button = tk.Button(control_frame, text="Run", command=self.run_code, bg="#2d2d2d", fg="white")
         self.run_button.pack(side="left", padx=5)
+
+        self.debug_button = tk.Button(control_frame, text="Debug Run", command=lambda: self.run_code(debug=True), bg="#2d2d2d", fg="white")
+        self.debug_button.pack(side="left", padx=5)
+
+        self.pause_button = tk.Button(control_frame, text="Pause", command=self.toggle_pause, bg="#2d2d2d", fg="white", state=tk.DISABLED)
+        self.pause_button.pack(side="left", padx=5)
+
+        self.stop_button = tk.Button(control_frame, text="Stop", command=self.stop_code, bg="#2d2d2d", fg="white", state=tk.DISABLED)
+        self.stop_button.pack(side="left", padx=5)
         
         self.step_button = tk.Button(control_frame, text="Step", command=self.step_code, bg="#2d2d2d", fg="white")
         self.step_button.pack(side="left", padx=5)
+
+        self.step_back_button = tk.Button(control_frame, text="Step Back", command=self.step_back_code, bg="#2d2d2d", fg="white")
+        self.step_back_button.pack(side="left", padx=5)
         
         self.reset_button = tk.Button(control_frame, text="Reset", command=self.reset_code, bg="#2d2d2d", fg="white")
         self.reset_button.pack(side="left", padx=5)
@@ -130,6 +789,22 @@ class BrainfuckIDE(tk.Tk):
         self.export_button = tk.Button(control_frame, text="Export Optimized", command=self.export_optimized_code, bg="#2d2d2d", fg="white")
         self.export_button.pack(side="left", padx=5)
 
+        tk.Label(control_frame, text="Cell bits:", bg="#1e1e1e", fg="white").pack(side="left", padx=(10, 0))
+        self.cell_bits = tk.IntVar(value=8)
+        self.cell_bits_menu = tk.OptionMenu(control_frame, self.cell_bits, *CELL_BITS)
+        self.cell_bits_menu.config(bg="#2d2d2d", fg="white", highlightthickness=0)
+        self.cell_bits_menu.pack(side="left", padx=5)
+
+        tk.Label(control_frame, text="Steps/frame:", bg="#1e1e1e", fg="white").pack(side="left", padx=(10, 0))
+        self.steps_per_frame = tk.IntVar(value=STEPS_PER_FRAME)
+        tk.Spinbox(control_frame, from_=1, to=10**7, increment=1000, width=8, textvariable=self.steps_per_frame,
+                   bg="#2d2d2d", fg="white", insertbackground="white").pack(side="left", padx=5)
+
+        tk.Label(control_frame, text="Go to step:", bg="#1e1e1e", fg="white").pack(side="left", padx=(10, 0))
+        self.goto_entry = tk.Entry(control_frame, width=10, bg="#2d2d2d", fg="white", insertbackground="white")
+        self.goto_entry.pack(side="left", padx=5)
+        self.goto_entry.bind("<Return>", self.goto_step)
+
         # --- Output ---
         tk.Label(self, text="Output:", bg="#1e1e1e", fg="white").pack(anchor="w", padx=10, pady=(5,0))
         self.output_box = scrolledtext.ScrolledText(self, height=6, font=("Courier", 12), state="disabled",
@@ -137,74 +812,89 @@ class BrainfuckIDE(tk.Tk):
         self.output_box.pack(fill="x", padx=10, pady=(0,5))
 
         # --- Memory Tape ---
-        tk.Label(self, text="Memory Tape:", bg="#1e1e1e", fg="white").pack(anchor="w", padx=10, pady=(5,0))
+        self.tape_label = tk.Label(self, text="Memory Tape:", bg="#1e1e1e", fg="white")
+        self.tape_label.pack(anchor="w", padx=10, pady=(5,0))
         self.tape_frame = tk.Frame(self, bg="#1e1e1e")
         self.tape_frame.pack(fill="x", padx=10, pady=(0,5))
         self.tape_cells = []
 
-        for i in range(20):  # Display first 20 cells
+        for i in range(TAPE_WINDOW):  # Display the window of cells around the pointer
             cell = tk.Label(self.tape_frame, text="0", width=4, borderwidth=2, relief="groove",
                             bg="#2d2d2d", fg="white")
             cell.pack(side="left", padx=1, pady=2)
             self.tape_cells.append(cell)
 
         self.interpreter = None
+        self.run_job = None # Pending after() id of the next slice of a background run
+        self.run_paused = False
+        self.run_breakpoints = set() # Op indexes the current run stops before
+        self.run_compiled = False # Whether the current run goes through run_compiled()
+        self.breakpoint_lines = set()
+        self.last_refresh = 0.0
+        self.shown_output_length = None # Length of program output in output_box; None if it shows something else
 
         # Initial update for line numbers
         self.update_line_numbers()
         
     def highlight_syntax(self, event=None):
-        # Remove existing tags
-        for tag in ["gtlt", "plusminus", "brackets", "dot", "comma"]:
-            self.editor.tag_remove(tag, "1.0", tk.END)
-
-        tags = {
-            '>': ("gtlt", "blue"),
-            '<': ("gtlt", "blue"),
-            '+': ("plusminus", "lime green"),
-            '-': ("plusminus", "lime green"),
-            '[': ("brackets", "orange"),
-            ']': ("brackets", "orange"),
-            '.': ("dot", "cyan"),
-            ',': ("comma", "magenta") 
-        }
-
-        for cmd, (tag, color) in tags.items():
-            self.editor.tag_config(tag, foreground=color)
-            start = "1.0"
-            while True:
-                pos = self.editor.search(cmd, start, stopindex=tk.END, regexp=False) # Use regexp=False for literal search
-                if not pos:
-                    break
-                end = f"{pos}+1c"
-                self.editor.tag_add(tag, pos, end)
-                start = end
+        """Highlights the whole buffer."""
+        self.highlight_lines(1, int(self.editor.index('end-1c').split('.')[0]))
+
+    def remember_edit_line(self, event=None):
+        self.edit_start_line = int(self.editor.index(tk.INSERT).split('.')[0])
+
+    def highlight_edit(self, event=None):
+        """Re-highlights the lines a keystroke touched (from where the cursor was to where it is)."""
+        current_line = int(self.editor.index(tk.INSERT).split('.')[0])
+        self.highlight_lines(min(self.edit_start_line, current_line), max(self.edit_start_line, current_line))
+
+    def highlight_lines(self, first_line, last_line):
+        """Re-tags lines first_line..last_line in one pass, one tag range per run of commands."""
+        start, end = f"{first_line}.0", f"{last_line}.end"
+        for tag in SYNTAX_TAGS:
+            self.editor.tag_remove(tag, start, end)
+
+        ranges = {tag: [] for tag in SYNTAX_TAGS}
+        text = self.editor.get(start, end)
+        for line_number, line in enumerate(text.split('\n'), first_line):
+            for run in SYNTAX_RUN_PATTERN.finditer(line):
+                ranges[SYNTAX_TAG_FOR[line[run.start()]]].extend((f"{line_number}.{run.start()}", f"{line_number}.{run.end()}"))
+        for tag, indexes in ranges.items():
+            step = 2 * TAG_RANGES_PER_CALL
+            for i in range(0, len(indexes), step):
+                self.editor.tag_add(tag, *indexes[i:i + step])
 
         self.update_line_numbers()
 
     def update_line_numbers(self):
-        # Calculate how many lines are currently in the Text widget
+        """Draws the numbers of the visible lines, reusing the canvas items."""
         total_lines = int(self.editor.index('end-1c').split('.')[0])
-        
-        # Get the visible range of lines in the editor
         first_visible_line = int(self.editor.index("@0,0").split('.')[0])
-        last_visible_line = int(self.editor.index(f"@0,{self.editor.winfo_height()}").split('.')[0]) + 1
-        
-        self.line_number_canvas.delete("all")
-        
-        # Iterate through visible lines and draw their numbers
-        for i in range(first_visible_line, max(total_lines + 1, last_visible_line)):
+        last_visible_line = min(int(self.editor.index(f"@0,{self.editor.winfo_height()}").split('.')[0]), total_lines)
+
+        items = self.line_number_items
+        shown = 0
+        for i in range(first_visible_line, last_visible_line + 1):
             # Get the y-coordinate of the current line's text
             dline_info = self.editor.dlineinfo(f"{i}.0")
-            if dline_info:
-                y_pos = dline_info[1]
-                self.line_number_canvas.create_text(
-                    2, y_pos, 
-                    anchor="nw", 
-                    text=str(i), 
-                    fill="white",
+            if not dline_info:
+                continue
+            fill = "#ff5555" if i in self.breakpoint_lines else "white"
+            if shown < len(items):
+                item = items[shown]
+                self.line_number_canvas.coords(item, 2, dline_info[1])
+                self.line_number_canvas.itemconfig(item, text=str(i), fill=fill, state="normal")
+            else:
+                items.append(self.line_number_canvas.create_text(
+                    2, dline_info[1],
+                    anchor="nw",
+                    text=str(i),
+                    fill=fill,
                     font=("Courier", 12) # Match editor font size
-                )
+                ))
+            shown += 1
+        for item in items[shown:]:
+            self.line_number_canvas.itemconfig(item, state="hidden")
 
     def on_editor_scroll(self, *args):
         # Sync the vertical scrollbar of the editor with the line numbers
@@ -216,43 +906,147 @@ class BrainfuckIDE(tk.Tk):
         self.editor.yview_scroll(-1 * (event.delta // 120), "units")
         self.update_line_numbers()
 
-    def run_code(self):
+    def toggle_breakpoint(self, event):
+        line = int(self.editor.index(f"@0,{event.y}").split('.')[0])
+        self.breakpoint_lines.symmetric_difference_update({line})
+        self.update_line_numbers()
+
+    def breakpoint_positions(self, code):
+        """Command positions of the first Brainfuck command on each breakpoint line."""
+        positions = set()
+        marked_lines = set()
+        line = 1
+        position = 0
+        for char in code:
+            if char == '\n':
+                line += 1
+            elif char in BF_COMMANDS:
+                if line in self.breakpoint_lines and line not in marked_lines:
+                    marked_lines.add(line)
+                    positions.add(position)
+                position += 1
+        return positions
+
+    def run_code(self, debug=False):
         """
-        Executes the Brainfuck code synchronously (on the main thread).
-        May cause UI freeze for very long-running programs.
+        Runs the Brainfuck code in the background: slices are scheduled with after(), so
+        the UI stays responsive. Tape and output are refreshed at most every
+        UI_REFRESH_INTERVAL seconds.
+        Without breakpoints a plain Run executes generated Python (run_compiled), with
+        'Steps/frame' loop iterations per slice. A Debug Run, or a run with breakpoints,
+        executes the ops ('Steps/frame' ops per slice) and stops at breakpoints; a Debug
+        Run also records history, so it can be stepped back and sought through.
         """
         code = self.editor.get("1.0", "end-1c")
         input_data = self.input_entry.get()
-        
-        # Disable buttons during execution (will re-enable at end)
-        self.run_button.config(state=tk.DISABLED)
-        self.step_button.config(state=tk.DISABLED)
-        self.reset_button.config(state=tk.DISABLED) 
-        self.save_button.config(state=tk.DISABLED)
-        self.load_button.config(state=tk.DISABLED)
-        self.export_button.config(state=tk.DISABLED)
+        self.cancel_run()
+        try:
+            self.interpreter = BrainfuckInterpreter(code, input_data, self.cell_bits.get())
+            if debug:
+                self.interpreter.enable_history() # Lets a paused or finished run be stepped back
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.run_breakpoints = self.interpreter.breakpoint_ops(self.breakpoint_positions(code))
+        self.run_compiled = not debug and not self.run_breakpoints
+        self.display_output("")
+        self.update_memory()
+        self.run_paused = False
+        self.pause_button.config(text="Pause")
+        self.set_controls(running=True)
+        self.run_job = self.after(1, self.run_slice)
 
+    def run_slice(self):
+        """Runs one slice of a background run and schedules the next one."""
+        self.run_job = None
         try:
-            self.interpreter = BrainfuckInterpreter(code, input_data)
-            self.display_output("Running Brainfuck code...") # Initial message
-            self.update_memory()
+            steps = max(1, int(self.steps_per_frame.get()))
+        except (tk.TclError, ValueError):
+            steps = STEPS_PER_FRAME
+        try:
+            status = self.interpreter.run_compiled(steps) if self.run_compiled else None
+            if status is None: # Not compiled (or Python couldn't compile it): run the ops
+                self.run_compiled = False
+                status = self.interpreter.run_ops(steps, self.run_breakpoints)
+        except Exception as e:
+            self.finish_run()
+            messagebox.showerror("Error", str(e))
+            return
 
-            output = self.interpreter.run_all() # This is the synchronous call
-            
-            self.display_output(output) # Display final output
-            self.update_memory() # Update memory one last time
+        if status == "finished":
+            self.finish_run()
             messagebox.showinfo("Execution Finished", "Brainfuck program execution completed.")
+        elif status == "breakpoint":
+            self.pause_run()
+        else:
+            if time.perf_counter() - self.last_refresh >= UI_REFRESH_INTERVAL:
+                self.refresh_run_view()
+            self.run_job = self.after(1, self.run_slice)
 
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-        finally:
-            # Always re-enable buttons
-            self.run_button.config(state=tk.NORMAL)
-            self.step_button.config(state=tk.NORMAL)
-            self.reset_button.config(state=tk.NORMAL)
-            self.save_button.config(state=tk.NORMAL)
-            self.load_button.config(state=tk.NORMAL)
-            self.export_button.config(state=tk.NORMAL)
+    def toggle_pause(self):
+        if self.run_paused:
+            self.run_paused = False
+            self.pause_button.config(text="Pause")
+            self.set_controls(running=True)
+            self.run_job = self.after(1, self.run_slice)
+        elif self.run_job is not None:
+            self.cancel_run()
+            self.pause_run()
+
+    def pause_run(self):
+        self.run_paused = True
+        self.refresh_run_view()
+        self.set_controls(running=False)
+        self.pause_button.config(text="Resume", state=tk.NORMAL)
+        self.stop_button.config(state=tk.NORMAL)
+
+    def stop_code(self):
+        """Stops a background run; the tape and output stay as they were."""
+        self.cancel_run()
+        if self.interpreter:
+            self.interpreter.stop_compiled_run() # A generated-Python run can't go on as steps
+        self.finish_run()
+
+    def cancel_run(self):
+        if self.run_job is not None:
+            self.after_cancel(self.run_job)
+            self.run_job = None
+
+    def finish_run(self):
+        self.run_paused = False
+        self.pause_button.config(text="Pause")
+        self.refresh_run_view()
+        self.set_controls(running=False)
+
+    def refresh_run_view(self):
+        """Shows the current tape window and any output not shown yet."""
+        self.last_refresh = time.perf_counter()
+        if not self.interpreter:
+            return
+        output = self.interpreter.output
+        if self.shown_output_length is None or len(output) < self.shown_output_length:
+            self.display_output(output)
+        elif len(output) > self.shown_output_length:
+            self.output_box.config(state='normal')
+            self.output_box.insert(tk.END, output[self.shown_output_length:])
+            self.output_box.see(tk.END)
+            self.output_box.config(state='disabled')
+        self.shown_output_length = len(output)
+        self.update_memory()
+
+    def set_controls(self, running):
+        """Enables the editing/run buttons when idle, Pause/Stop while a run is going."""
+        idle_state = tk.DISABLED if running else tk.NORMAL
+        for button in (self.run_button, self.debug_button, self.step_button, self.step_back_button, self.goto_entry,
+                       self.reset_button, self.save_button, self.load_button, self.export_button, self.cell_bits_menu):
+            button.config(state=idle_state)
+        if self.interpreter and self.interpreter.compiled_run is not None:
+            # A paused generated-Python run has no pc to step from
+            for button in (self.step_button, self.step_back_button, self.goto_entry):
+                button.config(state=tk.DISABLED)
+        run_state = tk.NORMAL if running else tk.DISABLED
+        self.pause_button.config(state=run_state)
+        self.stop_button.config(state=run_state)
 
 
     def step_code(self):
@@ -260,7 +1054,8 @@ class BrainfuckIDE(tk.Tk):
             code = self.editor.get("1.0", "end-1c")
             input_data = self.input_entry.get()
             try:
-                self.interpreter = BrainfuckInterpreter(code, input_data)
+                self.interpreter = BrainfuckInterpreter(code, input_data, self.cell_bits.get())
+                self.interpreter.enable_history()
                 self.display_output("Stepping through code...")
                 self.update_memory()
             except Exception as e:
@@ -278,21 +1073,56 @@ class BrainfuckIDE(tk.Tk):
         else:
             messagebox.showinfo("Execution Finished", "Program execution completed (no more steps).")
 
+    def step_back_code(self):
+        """Undoes the last step (or the last command of a paused or finished run)."""
+        if not self.interpreter:
+            return
+        if self.interpreter.history is None:
+            messagebox.showinfo("Step Back", "Only Debug Runs and stepping keep the history needed to step back.")
+            return
+        if self.interpreter.steps == 0:
+            messagebox.showinfo("Step Back", "Already at the start of the program.")
+            return
+        self.interpreter.step_back()
+        self.refresh_run_view()
+
+    def goto_step(self, event=None):
+        """Jumps to the step number typed in 'Go to step', running forward if it hasn't been reached yet."""
+        if self.run_job is not None:
+            return # Only while idle or paused
+        try:
+            target = int(self.goto_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Enter a step number.")
+            return
+        if not self.interpreter or self.interpreter.history is None: # Replayed from the start with history
+            code = self.editor.get("1.0", "end-1c")
+            try:
+                self.interpreter = BrainfuckInterpreter(code, self.input_entry.get(), self.cell_bits.get())
+                self.interpreter.enable_history()
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+        try:
+            self.interpreter.seek(target)
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+        self.refresh_run_view()
+
 
     def reset_code(self):
+        self.cancel_run()
         self.interpreter = None
         self.display_output("")
-        self.update_memory([0] * 20)
-        # Ensure buttons are enabled after reset, as no _execution_finished() is called automatically
-        self.run_button.config(state=tk.NORMAL)
-        self.step_button.config(state=tk.NORMAL)
-        self.reset_button.config(state=tk.NORMAL)
-        self.save_button.config(state=tk.NORMAL)
-        self.load_button.config(state=tk.NORMAL)
-        self.export_button.config(state=tk.NORMAL)
+        self.update_memory([0] * TAPE_WINDOW)
+        # Ensure buttons are enabled after reset
+        self.run_paused = False
+        self.pause_button.config(text="Pause")
+        self.set_controls(running=False)
 
 
     def display_output(self, text):
+        self.shown_output_length = None
         self.output_box.config(state='normal')
         self.output_box.delete("1.0", tk.END)
         self.output_box.insert(tk.END, text)
@@ -302,14 +1132,21 @@ class BrainfuckIDE(tk.Tk):
         if not self.interpreter:
             for label in self.tape_cells:
                 label.config(text="0", bg="#2d2d2d") # Reverted to dark mode default
+            self.tape_label.config(text="Memory Tape:")
             return
 
         tape = self.interpreter.cells
         ptr = self.interpreter.ptr
-        for i in range(20):
-            val = tape[i]
-            bg = "#8a7500" if i == ptr else "#2d2d2d"
+        first = max(ptr, 0) // TAPE_WINDOW * TAPE_WINDOW # The window follows the pointer
+        for i in range(TAPE_WINDOW):
+            index = first + i
+            val = tape[index] if index < len(tape) else 0
+            bg = "#8a7500" if index == ptr else "#2d2d2d"
             self.tape_cells[i].config(text=str(val), bg=bg)
+        if self.interpreter.history is not None: # Steps are only counted with history
+            self.tape_label.config(text=f"Memory Tape (cells {first}-{first + TAPE_WINDOW - 1}, step {self.interpreter.steps}):")
+        else:
+            self.tape_label.config(text=f"Memory Tape (cells {first}-{first + TAPE_WINDOW - 1}):")
 
     def save_code(self):
         code = self.editor.get("1.0", "end-1c")
@@ -339,7 +1176,7 @@ class BrainfuckIDE(tk.Tk):
 
     def export_optimized_code(self):
         code = self.editor.get("1.0", "end-1c")
-        optimized_code = self.optimize_brainfuck(code)
+        optimized_code = self.optimize_brainfuck(code, self.cell_bits.get())
         file_path = filedialog.asksaveasfilename(defaultextension=".b", filetypes=[("Brainfuck files", "*.b")])
         if file_path:
             try:
@@ -350,14 +1187,12 @@ class BrainfuckIDE(tk.Tk):
                 messagebox.showerror("Export Error", f"Could not export file: {e}")
 
 
-    def optimize_brainfuck(self, code):
+    def optimize_brainfuck(self, code, cell_bits=8):
         """
-        Removes non-Brainfuck characters from the code.
-        Note: For actual Brainfuck optimization (e.g., combining `+++` or detecting `[-]`),
-        a more advanced parsing and optimization algorithm would be needed.
+        Removes non-Brainfuck characters and writes out the compiled form: +/- and </>
+        runs cancelled and shortened, clear/move/scan loops normalised, dead loops dropped.
         """
-        clean_code = [c for c in code if c in BF_COMMANDS]
-        return ''.join(clean_code)
+        return brainfuck_from_ops(compile_brainfuck(code, cell_bits), cell_bits)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,137 @@ import threading
 import wave
 import struct
 
+SAMPLE_RATE = 44100
+TONE_DURATION = 0.1  # seconds per bit
+FREQUENCY_MAP = {
+    '0': 220,  # A3
+    '1': 440   # A4
+}
+NUM_CHANNELS = 1
+BYTES_PER_SAMPLE = 2  # 16-bit audio
+# Input bytes (or binary numbers) encoded per writeframes call. One byte is 0.8 s of
+# audio (about 70 KB of samples), so a chunk stays around 9 MB whatever the input size.
+BYTES_PER_CHUNK = 128
+
+def read_file_chunks(file_path, chunk_size=BYTES_PER_CHUNK):
+    """Yields the file's contents chunk_size bytes at a time, so only one chunk is in memory."""
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def _render_tone(frequency):
+    t = np.linspace(0, TONE_DURATION, int(SAMPLE_RATE * TONE_DURATION), False)
+    note = np.sin(2 * np.pi * frequency * t)
+    normalized_note = note * (2**15 - 1) / np.max(np.abs(note))
+    return normalized_note.astype(np.int16)
+
+# Tone table, rendered once: row 0 is a 0 bit, row 1 a 1 bit, row 2 silence (unrecognized bits)
+SILENCE = 2
+TONE_TABLE = np.stack([_render_tone(FREQUENCY_MAP['0']), _render_tone(FREQUENCY_MAP['1']),
+                       np.zeros(int(SAMPLE_RATE * TONE_DURATION), dtype=np.int16)])
+
+def tones_from_bytes(data_bytes):
+    """Tone table rows for the bits of data_bytes, most significant bit first."""
+    return np.unpackbits(np.frombuffer(data_bytes, dtype=np.uint8))
+
+def tones_from_binary_numbers(binary_numbers):
+    """Tone table rows for the characters of binary number strings: '0', '1', anything else is silence."""
+    codes = np.frombuffer(''.join(binary_numbers).encode('utf-32-le'), dtype=np.uint32)
+    return np.where(codes == ord('0'), 0, np.where(codes == ord('1'), 1, SILENCE))
+
+def synthesize_tones(tones):
+    """Returns the 16-bit samples for an array of tone table rows."""
+    return TONE_TABLE[tones].tobytes()
+
+def tone_chunks(input_data, input_type, binary_file_path=None):
+    """
+    Yields arrays of tone table rows for the input, a chunk at a time. input_type is
+    "binary_numbers" or "text" (input_data is used) or "binary_file" (binary_file_path is read).
+    """
+    if input_type == "binary_numbers":
+        binary_numbers = input_data.split()
+        for i in range(0, len(binary_numbers), BYTES_PER_CHUNK):
+            yield tones_from_binary_numbers(binary_numbers[i:i + BYTES_PER_CHUNK])
+    elif input_type == "text":
+        encoded_bytes = input_data.encode('utf-8')
+        for i in range(0, len(encoded_bytes), BYTES_PER_CHUNK):
+            yield tones_from_bytes(encoded_bytes[i:i + BYTES_PER_CHUNK])
+    elif input_type == "binary_file":
+        yield from map(tones_from_bytes, read_file_chunks(binary_file_path))
+    else:
+        raise ValueError(f"Unknown input type: {input_type}")
+
+def write_tones_to_wav(chunks, output_file):
+    """Writes chunks of tone table rows to a WAV file, one writeframes call per chunk."""
+    with wave.open(output_file, 'w') as wf:
+        wf.setnchannels(NUM_CHANNELS)
+        wf.setsampwidth(BYTES_PER_SAMPLE)
+        wf.setframerate(SAMPLE_RATE)
+        for tones in chunks:
+            wf.writeframes(synthesize_tones(tones))
+
+def convert_file_to_audio(input_path, output_file):
+    """Encodes a binary file as a WAV file (streamed, so any file size works)."""
+    write_tones_to_wav(tone_chunks(None, "binary_file", input_path), output_file)
+
+# --- Decoding ---
+# Goertzel-style detection, done for a whole chunk of bit windows with one matrix product:
+# the window's power at each tone frequency is its squared projection on a cosine and a
+# sine at that frequency. Both tones fit a whole number of cycles in a window, so the
+# other tone projects to ~0. Windows with little power at either (silence) are skipped.
+SAMPLES_PER_BIT = int(SAMPLE_RATE * TONE_DURATION)
+BITS_PER_DECODE_CHUNK = 8 * 1024 # Windows read at a time (about 72 MB of int16 samples)
+WINDOWS_PER_PROJECTION = 512 # Windows converted to float32 at a time (about 9 MB)
+SILENCE_THRESHOLD = 0.01 # Fraction of a full-scale tone's power below which a window is silent
+
+def _tone_basis():
+    t = np.arange(SAMPLES_PER_BIT) / SAMPLE_RATE
+    columns = []
+    for bit in ('0', '1'):
+        columns.append(np.cos(2 * np.pi * FREQUENCY_MAP[bit] * t))
+        columns.append(np.sin(2 * np.pi * FREQUENCY_MAP[bit] * t))
+    return np.stack(columns, axis=1).astype(np.float32)
+
+TONE_BASIS = _tone_basis() # (SAMPLES_PER_BIT, 4): cos/sin of the 0 tone, then of the 1 tone
+FULL_SCALE_POWER = (2**15 - 1) ** 2 * (SAMPLES_PER_BIT / 2) ** 2
+
+def decode_tone_windows(samples):
+    """Decodes int16 samples (a whole number of bit windows) to an array of bits, skipping silent windows."""
+    windows = samples.reshape(-1, SAMPLES_PER_BIT)
+    projections = np.empty((len(windows), TONE_BASIS.shape[1]), dtype=np.float32)
+    for start in range(0, len(windows), WINDOWS_PER_PROJECTION):
+        stop = start + WINDOWS_PER_PROJECTION
+        projections[start:stop] = windows[start:stop].astype(np.float32) @ TONE_BASIS
+    power = projections ** 2
+    zero_power = power[:, 0] + power[:, 1]
+    one_power = power[:, 2] + power[:, 3]
+    bits = (one_power > zero_power).astype(np.uint8)
+    return bits[np.maximum(zero_power, one_power) >= SILENCE_THRESHOLD * FULL_SCALE_POWER]
+
+def iter_decoded_audio(audio_path):
+    """Yields the data encoded in a WAV file made by this converter, one chunk at a time."""
+    with wave.open(audio_path, 'rb') as wf:
+        if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (NUM_CHANNELS, BYTES_PER_SAMPLE, SAMPLE_RATE):
+            raise ValueError(f"Expected {NUM_CHANNELS} channel, {8 * BYTES_PER_SAMPLE}-bit, {SAMPLE_RATE} Hz audio")
+        leftover = np.zeros(0, dtype=np.uint8) # Bits of an unfinished byte, carried to the next chunk
+        while True:
+            frames = wf.readframes(BITS_PER_DECODE_CHUNK * SAMPLES_PER_BIT)
+            samples = np.frombuffer(frames, dtype='<i2')
+            samples = samples[:len(samples) - len(samples) % SAMPLES_PER_BIT]
+            if not len(samples):
+                break
+            bits = np.concatenate([leftover, decode_tone_windows(samples)])
+            whole = len(bits) - len(bits) % 8
+            leftover = bits[whole:]
+            yield np.packbits(bits[:whole]).tobytes()
+
+def decode_audio_to_bytes(audio_path):
+    """Returns the data encoded in a WAV file made by this converter."""
+    return b''.join(iter_decoded_audio(audio_path))
+
 class DataToAudioFileConverter:
     def __init__(self, master):
         self.master = master
@@ -95,49 +226,10 @@ class DataToAudioFileConverter:
 
     def convert_to_audio_file(self, input_data, input_type, binary_file_path, output_file):
         try:
-            all_binary_data = []
-
-            if input_type == "binary_numbers":
-                all_binary_data = input_data.split()
-            elif input_type == "text":
-                encoded_bytes = input_data.encode('utf-8')
-                all_binary_data = [format(byte, '08b') for byte in encoded_bytes]
-            elif input_type == "binary_file":
-                if binary_file_path == "Not selected":
-                    self.master.after(0, self.status_label.config, {"text": "Please select a binary file."})
-                    return
-                with open(binary_file_path, 'rb') as f:
-                    byte_data = f.read()
-                all_binary_data = [format(byte, '08b') for byte in byte_data]
-
-            sample_rate = 44100
-            duration = 0.1  # seconds
-            frequency_map = {
-                '0': 220,  # A3
-                '1': 440   # A4
-            }
-            num_channels = 1
-            bytes_per_sample = 2  # 16-bit audio
-
-            audio_data = []
-            for binary_str in all_binary_data:
-                for bit in binary_str:
-                    frequency = frequency_map.get(bit, 0)
-                    if frequency > 0:
-                        t = np.linspace(0, duration, int(sample_rate * duration), False)
-                        note = np.sin(2 * np.pi * frequency * t)
-                        normalized_note = note * (2**15 - 1) / np.max(np.abs(note))
-                        audio_data.extend(normalized_note.astype(np.int16).tobytes())
-                    else:
-                        # Add silence for unrecognized bits
-                        silent_frame = np.zeros(int(sample_rate * duration), dtype=np.int16).tobytes()
-                        audio_data.extend(silent_frame)
-
-            with wave.open(output_file, 'w') as wf:
-                wf.setnchannels(num_channels)
-                wf.setsampwidth(bytes_per_sample)
-                wf.setframerate(sample_rate)
-                wf.writeframes(b''.join(audio_data))
+            if input_type == "binary_file" and binary_file_path == "Not selected":
+                self.master.after(0, self.status_label.config, {"text": "Please select a binary file."})
+                return
+            write_tones_to_wav(tone_chunks(input_data, input_type, binary_file_path), output_file)
 
             self.master.after(0, self.status_label.config, {"text": f"Audio file saved to {output_file}"})
 
@@ -3,7 +3,338 @@ from tkinter import filedialog, messagebox
 import cv2
 import numpy as np
 import os
+import struct
 import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from reedsolo import RSCodec
+except ImportError: # Optional: only profiles with parity need it
+    RSCodec = None
+
+# --- Encoding profile ---
+# Frames are a grid of square_size px squares, filled row by row. Each square holds
+# bits_per_square bits (most significant first), shown as a colour from PALETTES; the
+# grid's unused squares are black. With parity, the data is Reed-Solomon coded in
+# RS_BLOCK_SIZE-byte blocks first. Any profile other than the classic one starts with a
+# header frame describing it, so the decoder needs no settings.
+PALETTES = { # BGR, indexed by square value
+    1: [(0, 0, 255), (0, 255, 0)], # Red 0, green 1
+    2: [(0, 0, 0), (85, 85, 85), (170, 170, 170), (255, 255, 255)], # Grey levels: brightness survives XVID best
+    3: [(0, 0, 0), (0, 0, 255), (0, 255, 0), (0, 255, 255), (255, 0, 0), (255, 0, 255), (255, 255, 0), (255, 255, 255)],
+}
+BLACK = (0, 0, 0)
+RS_BLOCK_SIZE = 255
+BATCH_PIXELS = 64 * 256 * 256 # Pixels built per NumPy pass (12 MB), split into whole frames
+
+HEADER_MAGIC = b'F2VP'
+HEADER_FORMAT = '<4sHHBBBQ' # Magic, frame width, height, square size, bits per square, parity bytes, data length
+HEADER_SQUARE_SIZE = 8
+
+def _rs_codec(parity_bytes):
+    if RSCodec is None:
+        raise RuntimeError("Reed-Solomon parity needs the reedsolo package (pip install reedsolo)")
+    return RSCodec(parity_bytes, nsize=RS_BLOCK_SIZE)
+
+class VideoProfile:
+    """A frame layout (see above). fps only affects playback; the decoder reads any frame rate."""
+    def __init__(self, frame_width=256, frame_height=256, square_size=4, bits_per_square=1, parity_bytes=0, fps=60):
+        if bits_per_square not in PALETTES:
+            raise ValueError(f"bits_per_square must be one of {sorted(PALETTES)}")
+        if square_size < 1 or frame_width < square_size or frame_height < square_size:
+            raise ValueError("Frames must hold at least one square")
+        if not 0 <= parity_bytes < RS_BLOCK_SIZE:
+            raise ValueError(f"parity_bytes must be 0-{RS_BLOCK_SIZE - 1}")
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.square_size = square_size
+        self.bits_per_square = bits_per_square
+        self.parity_bytes = parity_bytes
+        self.fps = fps
+        self.squares_x = frame_width // square_size
+        self.squares_y = frame_height // square_size
+        self.squares_per_frame = self.squares_x * self.squares_y
+        self.bytes_per_frame = self.squares_per_frame * bits_per_square // 8
+        self.frames_per_batch = max(1, BATCH_PIXELS // (frame_width * frame_height))
+        self.empty_square = len(PALETTES[bits_per_square]) # Value of unused squares (black)
+        self.colors = np.array(PALETTES[bits_per_square] + [BLACK], dtype=np.uint8)
+        self.header = self.layout() != CLASSIC_LAYOUT
+        if self.header and (frame_width // HEADER_SQUARE_SIZE) * (frame_height // HEADER_SQUARE_SIZE) < 8 * struct.calcsize(HEADER_FORMAT):
+            raise ValueError("Frames are too small for the header")
+        if self.bytes_per_frame == 0:
+            raise ValueError("Frames must hold at least one byte")
+
+    def layout(self):
+        return (self.frame_width, self.frame_height, self.square_size, self.bits_per_square, self.parity_bytes)
+
+    def coded_length(self, data_length):
+        """Bytes stored for data_length bytes of data, parity included."""
+        if not self.parity_bytes:
+            return data_length
+        block_data = RS_BLOCK_SIZE - self.parity_bytes
+        return data_length + -(-data_length // block_data) * self.parity_bytes
+
+    def __repr__(self):
+        return (f"VideoProfile({self.frame_width}x{self.frame_height}, {self.square_size} px squares, "
+                f"{self.bits_per_square} bits/square, {self.parity_bytes} parity bytes)")
+
+CLASSIC_LAYOUT = (256, 256, 4, 1, 0) # The original format: 64x64 squares, 512 bytes per frame, no header
+PROFILES = {
+    "classic": VideoProfile(),
+    "hd": VideoProfile(1280, 720, 4, 2), # 14,400 bytes per frame
+    "hd-rs": VideoProfile(1280, 720, 4, 2, parity_bytes=32), # Same, with 32 parity bytes per 255
+    "hd-dense": VideoProfile(1280, 720, 4, 3, parity_bytes=32), # 21,600 bytes per frame
+}
+
+# --- Frame encoding ---
+def encode_frame_batches(data_bytes, profile=PROFILES["classic"]):
+    """
+    Yields the frames showing data_bytes (already parity coded) as uint8 arrays of shape
+    (frames, frame_height, frame_width, 3), up to profile.frames_per_batch frames at a time.
+    """
+    data = np.frombuffer(data_bytes, dtype=np.uint8)
+    bits_per_square = profile.bits_per_square
+    batch_bytes = profile.bytes_per_frame * profile.frames_per_batch
+    for start in range(0, len(data), batch_bytes):
+        chunk = data[start:start + batch_bytes]
+        frame_count = -(-len(chunk) // profile.bytes_per_frame)
+        # Square values: each frame's bytes as bits, padded to a whole square, bits_per_square at a time
+        frame_bits = profile.bytes_per_frame * 8
+        squares_used = -(-frame_bits // bits_per_square)
+        data_bits = np.zeros(frame_count * frame_bits, dtype=np.uint8)
+        data_bits[:len(chunk) * 8] = np.unpackbits(chunk)
+        bits = np.zeros((frame_count, squares_used * bits_per_square), dtype=np.uint8)
+        bits[:, :frame_bits] = data_bits.reshape(frame_count, frame_bits)
+        values = bits.reshape(frame_count, squares_used, bits_per_square)
+        if bits_per_square > 1:
+            values = values @ (1 << np.arange(bits_per_square - 1, -1, -1, dtype=np.uint8))
+        else:
+            values = values[..., 0]
+        squares = np.full((frame_count, profile.squares_per_frame), profile.empty_square, dtype=np.uint8)
+        squares[:, :squares_used] = values
+        last_bytes = len(chunk) - (frame_count - 1) * profile.bytes_per_frame
+        squares[-1, -(-last_bytes * 8 // bits_per_square):] = profile.empty_square # Past the data in the last frame
+        squares = squares.reshape(frame_count, profile.squares_y, profile.squares_x)
+        # Colour each square, then blow every square up to square_size x square_size pixels
+        frames = profile.colors[squares].repeat(profile.square_size, axis=1).repeat(profile.square_size, axis=2)
+        if frames.shape[1:3] != (profile.frame_height, profile.frame_width):
+            padded = np.zeros((frame_count, profile.frame_height, profile.frame_width, 3), dtype=np.uint8)
+            padded[:, :frames.shape[1], :frames.shape[2]] = frames
+            frames = padded
+        yield frames
+
+def header_frame(profile, data_length):
+    """The first frame of a non-classic video: the profile and data length, in large 1-bit squares."""
+    header = struct.pack(HEADER_FORMAT, HEADER_MAGIC, *profile.layout(), data_length)
+    header_layout = VideoProfile(profile.frame_width, profile.frame_height, HEADER_SQUARE_SIZE, 1)
+    return next(encode_frame_batches(header, header_layout))[0]
+
+def encode_video_frames(chunks, profile=PROFILES["classic"], data_length=None):
+    """
+    Yields batches of frames (see encode_frame_batches) for an iterable of byte chunks of
+    any size, adding the header frame and parity the profile asks for. Profiles with a
+    header need the total data_length up front.
+    """
+    if profile.header:
+        if data_length is None:
+            raise ValueError(f"{profile} needs the data length for its header frame")
+        yield header_frame(profile, data_length)[np.newaxis]
+    codec = _rs_codec(profile.parity_bytes) if profile.parity_bytes else None
+    block_data = RS_BLOCK_SIZE - profile.parity_bytes
+    batch_bytes = profile.bytes_per_frame * profile.frames_per_batch
+    uncoded = bytearray() # Data waiting for a whole parity block
+    pending = bytearray() # Coded data waiting for a whole batch of frames
+    for chunk in chunks:
+        if codec:
+            uncoded += chunk
+            whole = len(uncoded) - len(uncoded) % block_data
+            if whole:
+                pending += codec.encode(bytes(uncoded[:whole]))
+                del uncoded[:whole]
+        else:
+            pending += chunk
+        if len(pending) >= batch_bytes:
+            whole = len(pending) - len(pending) % batch_bytes
+            yield from encode_frame_batches(bytes(pending[:whole]), profile)
+            del pending[:whole]
+    if uncoded:
+        pending += codec.encode(bytes(uncoded)) # A shortened last block
+    if pending:
+        yield from encode_frame_batches(bytes(pending), profile)
+
+def read_file_chunks(file_path, chunk_size=1 << 20):
+    """Yields the file's contents chunk_size bytes at a time, so only one chunk is in memory."""
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def bytes_from_binary_text(text):
+    """Space-separated binary numbers ("01000001 01100010") to bytes."""
+    return bytes([int(b, 2) for b in text.split()])
+
+def encode_chunks_to_video(chunks, output_file, profile=PROFILES["classic"], data_length=None):
+    """Writes the frames for an iterable of byte chunks (see encode_video_frames)."""
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    out = cv2.VideoWriter(output_file, fourcc, profile.fps, (profile.frame_width, profile.frame_height), isColor=True)
+    if not out.isOpened():
+        raise IOError(f"Could not open output video: {output_file}")
+    try:
+        for frames in encode_video_frames(chunks, profile, data_length):
+            for frame in frames:
+                out.write(frame)
+    finally:
+        out.release()
+
+def encode_bytes_to_video(data_bytes, output_file, profile=PROFILES["classic"]):
+    encode_chunks_to_video([data_bytes], output_file, profile, len(data_bytes))
+
+def encode_file_to_video(input_path, output_file, profile=PROFILES["classic"]):
+    """Encodes a binary file as a video, streamed a batch of frames at a time, so any file size works."""
+    encode_chunks_to_video(read_file_chunks(input_path), output_file, profile, os.path.getsize(input_path))
+
+# --- Frame decoding ---
+# XVID is lossy, so a square is read from the mean of its inner pixels rather than one
+# pixel, and taken to be the nearest palette colour. In classic videos, black squares mark
+# where the data ends; other profiles have the data length in their header.
+DECODE_FRAMES_PER_JOB = 256 # Frames a decoding worker reads after seeking to its first one
+
+def read_frame_squares(frames, profile):
+    """Reads the square values of an array of BGR frames, as a (frames, squares_per_frame) array."""
+    size = profile.square_size
+    inner = slice(size // 4, size - size // 4)
+    grid = frames[:, :profile.squares_y * size, :profile.squares_x * size]
+    grid = grid.reshape(len(frames), profile.squares_y, size, profile.squares_x, size, 3)
+    means = grid[:, :, inner, :, inner].mean(axis=(2, 4), dtype=np.float32)
+    distances = ((means[..., np.newaxis, :] - profile.colors.astype(np.float32)) ** 2).sum(axis=-1)
+    return distances.argmin(axis=-1).astype(np.uint8).reshape(len(frames), -1)
+
+def square_bytes(squares, profile):
+    """The bytes held by an array of square values, frame by frame (empty squares left out in classic videos)."""
+    bits_per_square = profile.bits_per_square
+    if not profile.header:
+        squares = squares[squares != profile.empty_square]
+        return np.packbits(squares).tobytes()
+    used = -(-profile.bytes_per_frame * 8 // bits_per_square) # Squares holding the frame's bytes
+    values = np.minimum(squares[:, :used], profile.empty_square - 1)
+    bits = (values[..., np.newaxis] >> np.arange(bits_per_square - 1, -1, -1, dtype=np.uint8)) & 1
+    bits = bits.reshape(len(squares), -1)[:, :profile.bytes_per_frame * 8]
+    return np.packbits(bits, axis=1).tobytes()
+
+def read_header(frame):
+    """Returns (profile, data length) from a header frame, or None if the frame isn't one."""
+    height, width = frame.shape[:2]
+    if width < HEADER_SQUARE_SIZE or height < HEADER_SQUARE_SIZE:
+        return None
+    header_layout = VideoProfile(width, height, HEADER_SQUARE_SIZE, 1)
+    squares = read_frame_squares(frame[np.newaxis], header_layout)
+    header = square_bytes(squares, header_layout)[:struct.calcsize(HEADER_FORMAT)]
+    if len(header) < struct.calcsize(HEADER_FORMAT) or not header.startswith(HEADER_MAGIC):
+        return None
+    _, *layout, data_length = struct.unpack(HEADER_FORMAT, header)
+    try:
+        profile = VideoProfile(*layout)
+    except ValueError:
+        return None
+    if (profile.frame_width, profile.frame_height) != (width, height):
+        return None
+    return profile, data_length
+
+def _decode_frame_range(job):
+    """Process pool entry point: job is (video_path, profile, first_frame, frame_count or None for all)."""
+    video_path, profile, first_frame, frame_count = job
+    capture = cv2.VideoCapture(video_path)
+    decoded = []
+    frames = []
+    frames_read = 0
+    try:
+        if first_frame:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+        while frame_count is None or frames_read < frame_count:
+            ok, frame = capture.read()
+            if ok and frame.shape != (profile.frame_height, profile.frame_width, 3):
+                raise ValueError(f"Frame size {frame.shape[1]}x{frame.shape[0]} isn't {profile.frame_width}x{profile.frame_height}")
+            if ok:
+                frames.append(frame)
+                frames_read += 1
+            if frames and (not ok or len(frames) == profile.frames_per_batch):
+                decoded.append(square_bytes(read_frame_squares(np.stack(frames), profile), profile))
+                frames = []
+            if not ok:
+                break
+    finally:
+        capture.release()
+    return b''.join(decoded)
+
+def _strip_parity(coded_chunks, profile, data_length):
+    """Yields the data in a stream of coded chunks: parity checked and removed, padding cut off."""
+    codec = _rs_codec(profile.parity_bytes) if profile.parity_bytes else None
+    remaining = profile.coded_length(data_length)
+    data_left = data_length
+    pending = bytearray()
+    for chunk in coded_chunks:
+        pending += chunk[:remaining]
+        remaining -= len(chunk[:remaining])
+        if codec:
+            # Whole blocks, or everything once the (possibly shortened) last block is in
+            whole = len(pending) if not remaining else len(pending) - len(pending) % RS_BLOCK_SIZE
+            if not whole:
+                continue
+            decoded = codec.decode(bytes(pending[:whole]))
+            decoded = decoded[0] if isinstance(decoded, tuple) else decoded # reedsolo < 1.0 returns just the data
+            del pending[:whole]
+        else:
+            decoded = bytes(pending)
+            pending.clear()
+        decoded = bytes(decoded[:data_left])
+        data_left -= len(decoded)
+        yield decoded
+    if remaining:
+        raise ValueError(f"Video ends {remaining} bytes short of the length in its header")
+
+def iter_decoded_video(video_path, jobs=None):
+    """
+    Yields the data encoded in a video, in order, one range of DECODE_FRAMES_PER_JOB frames
+    at a time. The ranges are decoded across a process pool of `jobs` workers (default: CPU
+    count); jobs=1 decodes the whole video in this process.
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video: {video_path}")
+    frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    ok, first = capture.read()
+    capture.release()
+    header = read_header(first) if ok else None
+    if header:
+        profile, data_length = header
+        first_data_frame = 1
+    else:
+        profile, data_length = PROFILES["classic"], None
+        first_data_frame = 0
+
+    starts = range(first_data_frame, max(frame_count, first_data_frame + 1), DECODE_FRAMES_PER_JOB)
+    # The frame count is only an estimate for some containers: the last range reads to the end
+    job_list = [(video_path, profile, start, DECODE_FRAMES_PER_JOB) for start in starts[:-1]]
+    job_list.append((video_path, profile, starts[-1], None))
+    if jobs == 1 or len(job_list) == 1:
+        coded_chunks = map(_decode_frame_range, job_list)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        coded_chunks = executor.map(_decode_frame_range, job_list)
+    try:
+        if header:
+            yield from _strip_parity(coded_chunks, profile, data_length)
+        else:
+            yield from coded_chunks
+    finally:
+        if jobs != 1 and len(job_list) > 1:
+            executor.shutdown(cancel_futures=True)
+
+def decode_video_to_bytes(video_path, jobs=None):
+    """Returns the data encoded in a video made by encode_video_frames (see iter_decoded_video)."""
+    return b''.join(iter_decoded_video(video_path, jobs))
 
 class DataToVideoConverterWithBinaryFileThreadedEnhancedColors:
     def __init__(self, master):
@@ -33,6 +364,14 @@ class DataToVideoConverterWithBinaryFileThreadedEnhancedColors:
         self.binary_file_label.pack(pady=5)
         self.update_binary_file_widgets() # Initial state
 
+        self.profile_label = tk.Label(master, text="Encoding Profile:")
+        self.profile_label.pack(pady=5)
+
+        self.profile_name = tk.StringVar(master)
+        self.profile_name.set("classic")
+        self.profile_menu = tk.OptionMenu(master, self.profile_name, *PROFILES)
+        self.profile_menu.pack(padx=10, pady=5)
+
         self.output_path = tk.StringVar()
         self.output_path.set("Not selected")
         self.browse_output_button = tk.Button(master, text="Browse Output Path", command=self.browse_output)
@@ -89,68 +428,26 @@ class DataToVideoConverterWithBinaryFileThreadedEnhancedColors:
 
     def convert_data_to_video(self, data_type, output_file):
         try:
+            profile = PROFILES[self.profile_name.get()]
             if data_type == "text":
                 input_data = self.input_text.get("1.0", tk.END).strip()
-                data_bytes = input_data.encode('utf-8')
-                self.encode_bytes_to_video(data_bytes, output_file)
+                encode_bytes_to_video(input_data.encode('utf-8'), output_file, profile)
                 self.master.after(0, self.status_label.config, {"text": f"Text converted successfully! Video saved to {output_file}"})
             elif data_type == "binary":
                 input_data = self.input_text.get("1.0", tk.END).strip()
-                binary_strings = input_data.split()
-                data_bytes = bytes([int(b, 2) for b in binary_strings])
-                self.encode_bytes_to_video(data_bytes, output_file)
+                encode_bytes_to_video(bytes_from_binary_text(input_data), output_file, profile)
                 self.master.after(0, self.status_label.config, {"text": f"Binary text converted successfully! Video saved to {output_file}"})
             elif data_type == "binary file":
                 binary_file = self.binary_file_path.get()
                 if binary_file == "Not selected":
                     self.master.after(0, self.status_label.config, {"text": "Please select a binary file."})
                     return
-                with open(binary_file, 'rb') as f:
-                    data_bytes = f.read()
-                self.encode_bytes_to_video(data_bytes, output_file)
+                encode_file_to_video(binary_file, output_file, profile)
                 self.master.after(0, self.status_label.config, {"text": f"Binary file converted successfully! Video saved to {output_file}"})
 
         except Exception as e:
             self.master.after(0, self.status_label.config, {"text": f"Conversion failed: {e}"})
 
-    def encode_bytes_to_video(self, data_bytes, output_file):
-        frame_width = 256
-        frame_height = 256
-        fps = 60
-        fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        out = cv2.VideoWriter(output_file, fourcc, fps, (frame_width, frame_height), isColor=True)
-
-        num_squares_per_row = 64
-        square_size = frame_width // num_squares_per_row  # 256 / 64 = 4 pixels
-        bytes_per_frame = (num_squares_per_row * num_squares_per_row) // 8
-
-        for i in range(0, len(data_bytes), bytes_per_frame):
-            frame_bytes = data_bytes[i:i + bytes_per_frame]
-            frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
-
-            bit_index = 0
-            for byte_val in frame_bytes:
-                binary_representation = format(byte_val, '08b')
-                for bit in binary_representation:
-                    row = bit_index // num_squares_per_row
-                    col = bit_index % num_squares_per_row
-                    start_x = col * square_size
-                    end_x = start_x + square_size
-                    start_y = row * square_size
-                    end_y = start_y + square_size
-                    color = (0, 255, 0) if bit == '1' else (0, 0, 255)
-                    cv2.rectangle(frame, (start_x, start_y), (end_x, end_y), color, -1)
-                    bit_index += 1
-
-                    if bit_index >= num_squares_per_row * num_squares_per_row:
-                        break
-                if bit_index >= num_squares_per_row * num_squares_per_row:
-                    break
-
-            out.write(frame)
-
-        out.release()
-
 if __name__ == "__main__":
     root = tk.Tk()
     converter = DataToVideoConverterWithBinaryFileThreadedEnhancedColors(root)
@@ -1,32 +1,123 @@
 import re, shlex
-from colorama import Fore, Style, Back, init
+from colorama import Fore, Style, Back
+import atexit
+import inspect
+import io
 import math
 import time
 import random
 import copy # Might be needed later if tables are added
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import lru_cache
+from console_renderer import ConsoleRenderer
 
-variables = {}
-builtins = {} # Dictionary for built-in functions
+class BuiltinDict(dict):
+    """
+    A dict of builtins that counts its changes in `version`, so an interpreter can tell
+    when call sites it compiled may be bound to a builtin that has since been replaced.
+    """
+    version = 0
+
+    def _changes(method):
+        def changing(self, *args, **kwargs):
+            self.version += 1
+            return method(self, *args, **kwargs)
+        changing.__name__ = method.__name__
+        return changing
+
+    __setitem__ = _changes(dict.__setitem__)
+    __delitem__ = _changes(dict.__delitem__)
+    __ior__ = _changes(dict.__ior__)
+    update = _changes(dict.update)
+    pop = _changes(dict.pop)
+    popitem = _changes(dict.popitem)
+    setdefault = _changes(dict.setdefault)
+    clear = _changes(dict.clear)
+    del _changes
+
+variables = {} # Variables of the default interpreter (see InmInterpreter)
+builtins = BuiltinDict() # Dictionary for built-in functions; the defaults each InmInterpreter starts from
 
-init(autoreset=True)
 debug_mode = False # Default to False unless needed
+trace_mode = False # Record structured events in trace_buffer (no formatting, no printing)
+dump_trace_on_error = False # Print (and clear) the trace buffer whenever an error is reported
 muser_print_allowwed = False # Keep user setting
 
+TRACE_BUFFER_SIZE = 1000
+trace_buffer = deque(maxlen=TRACE_BUFFER_SIZE) # (perf_counter, event, fields) tuples, oldest dropped first
+# Call sites check this single flag before building any log arguments, so logging
+# costs nothing when it is off. Use set_logging() to change the modes at runtime.
+logging_enabled = debug_mode or trace_mode
+
 # --- Output Functions ---
+# Lines go through a buffered ConsoleRenderer (prefixes built once, ANSI only on a
+# terminal). Each InmInterpreter has a renderer for its output sink; the one for the
+# interpreter running in this thread/context is active, so builtins don't need to know it.
+
+def make_renderer(stream=None, color=None):
+    """Creates a ConsoleRenderer with the INM line styles. stream None means sys.stdout."""
+    renderer = ConsoleRenderer(stream, color)
+    renderer.add_style("muser", "[MUSER]: ", Back.WHITE + Fore.YELLOW + Style.BRIGHT, Fore.GREEN + Back.WHITE)
+    renderer.add_style("debug", "[DEBUG]: ", Back.WHITE + Fore.GREEN + Style.BRIGHT, Fore.GREEN + Back.WHITE)
+    renderer.add_style("output", "[OUTPUT]: ", Back.WHITE + Style.BRIGHT, Back.WHITE + Fore.BLACK)
+    renderer.add_style("error", "[ERROR]: ", Back.WHITE + Fore.RED + Style.BRIGHT, Fore.RED + Back.WHITE)
+    return renderer
+
+_default_renderer = make_renderer() # Shared by every interpreter writing to stdout
+atexit.register(_default_renderer.flush)
+_active_renderer = ContextVar("inm_active_renderer", default=_default_renderer)
+
 def muser_print(*args):
     if muser_print_allowwed:
-        print(f"{Back.WHITE}{Fore.YELLOW}{Style.BRIGHT}[MUSER]: {Style.RESET_ALL}{Fore.GREEN}{Back.WHITE}" + "".join(map(str, args)) + f"{Style.RESET_ALL}")
+        _active_renderer.get().write_line("muser", "".join(map(str, args)))
 
 def muser_debug_print(*args):
     if debug_mode:
-        print(f"{Back.WHITE}{Fore.GREEN}{Style.BRIGHT}[DEBUG]: {Style.RESET_ALL}{Fore.GREEN}{Back.WHITE}" + "".join(map(str, args)) + f"{Style.RESET_ALL}")
+        _active_renderer.get().write_line("debug", "".join(map(str, args)))
 
 def muser_output_print(*args):
-     print(f"{Back.WHITE}{Style.BRIGHT}[OUTPUT]: {Style.RESET_ALL}{Back.WHITE}{Fore.BLACK}" + "".join(map(str, args)) + f"{Style.RESET_ALL}")
+     _active_renderer.get().write_line("output", "".join(map(str, args)))
 
 def muser_error_print(*args):
-     print(f"{Back.WHITE}{Fore.RED}{Style.BRIGHT}[ERROR]: {Style.RESET_ALL}{Fore.RED}{Back.WHITE}" + "".join(map(str, args)) + f"{Style.RESET_ALL}")
+     _active_renderer.get().write_line("error", "".join(map(str, args)))
+     if dump_trace_on_error and trace_buffer:
+         dump_trace()
+
+# --- Debug / Trace Logging ---
+def set_logging(debug=None, trace=None, dump_on_error=None):
+    """Switches debug printing, tracing and dump-on-error on or off (None leaves a mode unchanged)."""
+    global debug_mode, trace_mode, dump_trace_on_error, logging_enabled
+    if debug is not None: debug_mode = debug
+    if trace is not None: trace_mode = trace
+    if dump_on_error is not None: dump_trace_on_error = dump_on_error
+    logging_enabled = debug_mode or trace_mode
+
+def muser_log(event, message, **fields):
+    """
+    Logs one event. `message` is a str.format template filled from `fields`, and is only
+    formatted when debug_mode is on; trace_mode stores the raw fields instead.
+    Guard calls with `if logging_enabled:` so nothing is built when logging is off.
+    """
+    if trace_mode:
+        # Snapshot token lists: callers keep appending to them after logging
+        fields = {key: tuple(value) if isinstance(value, list) else value for key, value in fields.items()}
+        trace_buffer.append((time.perf_counter(), event, fields))
+    if debug_mode:
+        muser_debug_print(message.format(**fields))
+
+def dump_trace():
+    """Prints the recorded trace events, oldest first, and clears the buffer."""
+    renderer = _active_renderer.get()
+    renderer.write_plain(f"--- Trace ({len(trace_buffer)} events) ---")
+    first_time = trace_buffer[0][0] if trace_buffer else 0
+    for event_time, event, fields in trace_buffer:
+        details = " ".join(f"{key}={value!r}" for key, value in fields.items())
+        renderer.write_plain(f" +{event_time - first_time:.6f}s {event} {details}")
+    renderer.write_plain("--- End of Trace ---")
+    trace_buffer.clear()
 
 # --- Built-in Function Implementations (Keep from previous version) ---
 def _convert_to_num(val):
@@ -36,38 +127,36 @@ def _convert_to_num(val):
         try: return float(val)
         except (ValueError, TypeError): return None
 
-# ... (Keep all _builtin_sqrt, _builtin_pow, ..., _builtin_tostring definitions) ...
+def _convert_to_str(val):
+    return str(val) if val is not None else None # nil stays nil
+
+# Arguments are converted according to the types declared in register_builtin()
+# before the call, so 'number' parameters get a number or None, 'string' a str or None.
 def _builtin_sqrt(x=None):
-    num_x = _convert_to_num(x)
-    if num_x is None or num_x < 0: muser_error_print("sqrt requires a non-negative number."); return None
-    return math.sqrt(num_x)
+    if x is None or x < 0: muser_error_print("sqrt requires a non-negative number."); return None
+    return math.sqrt(x)
 def _builtin_pow(base=None, exp=None):
-    num_base = _convert_to_num(base); num_exp = _convert_to_num(exp)
-    if num_base is None or num_exp is None: muser_error_print("pow requires two numbers."); return None
-    return math.pow(num_base, num_exp)
+    if base is None or exp is None: muser_error_print("pow requires two numbers."); return None
+    return math.pow(base, exp)
 def _builtin_random(a=None, b=None):
-    num_a = _convert_to_num(a); num_b = _convert_to_num(b)
-    if num_a is None and num_b is None: return random.random()
-    elif num_b is None:
-        if num_a is None or num_a <= 0: muser_error_print("random(max): max must be > 0."); return None
-        return random.randint(1, int(num_a))
+    if a is None and b is None: return random.random()
+    elif b is None:
+        if a is None or a <= 0: muser_error_print("random(max): max must be > 0."); return None
+        return random.randint(1, int(a))
     else:
-        if num_a is None or num_b is None: muser_error_print("random(min,max): requires two numbers."); return None
-        if num_a > num_b: muser_error_print("random(min,max): min cannot be greater than max."); return None
-        return random.randint(int(num_a), int(num_b))
-def _builtin_len(s=None): return len(str(s)) if s is not None else 0
-def _builtin_upper(s=None): return str(s).upper() if s is not None else ""
-def _builtin_lower(s=None): return str(s).lower() if s is not None else ""
+        if a is None or b is None: muser_error_print("random(min,max): requires two numbers."); return None
+        if a > b: muser_error_print("random(min,max): min cannot be greater than max."); return None
+        return random.randint(int(a), int(b))
+def _builtin_len(s=None): return len(s) if s is not None else 0
+def _builtin_upper(s=None): return s.upper() if s is not None else ""
+def _builtin_lower(s=None): return s.lower() if s is not None else ""
 def _builtin_sub(s=None, i=None, j=None):
-    s_str = str(s) if s is not None else ""; s_len = len(s_str)
-    num_i = _convert_to_num(i)
-    if num_i is None: muser_error_print("sub: index i must be number."); return ""
-    py_i = int(num_i) - 1 if num_i > 0 else s_len + int(num_i)
+    s_str = s if s is not None else ""; s_len = len(s_str)
+    if i is None: muser_error_print("sub: index i must be number."); return ""
+    py_i = int(i) - 1 if i > 0 else s_len + int(i)
     py_j_exclusive = s_len
     if j is not None:
-        num_j = _convert_to_num(j)
-        if num_j is None: muser_error_print("sub: index j must be number."); return ""
-        py_j = int(num_j) - 1 if num_j > 0 else s_len + int(num_j)
+        py_j = int(j) - 1 if j > 0 else s_len + int(j)
         py_j_exclusive = py_j + 1
     if py_i < 0: py_i = 0
     if py_j_exclusive > s_len: py_j_exclusive = s_len
@@ -91,84 +180,164 @@ def _builtin_tostring(val=None):
     if val is False: return "false"
     return str(val)
 
+# --- Builtin Registry ---
+ARGUMENT_CONVERTERS = {
+    'number': _convert_to_num,
+    'string': _convert_to_str,
+}
+
+class Builtin:
+    """A registered builtin: the function plus its declared arity and argument types."""
+    __slots__ = ('name', 'func', 'min_args', 'max_args', 'arg_types')
+
+    def __init__(self, name, func, min_args, max_args, arg_types):
+        self.name = name
+        self.func = func
+        self.min_args = min_args
+        self.max_args = max_args # None means any number of arguments
+        self.arg_types = arg_types # 'number', 'string' or None (passed as is), per position
+
+    def arity_text(self):
+        if self.max_args is None: return f"at least {self.min_args}"
+        if self.min_args == self.max_args: return str(self.min_args)
+        return f"{self.min_args} to {self.max_args}"
+
+builtin_table = {} # name -> Builtin, for callable builtins
+
+def register_builtin(name, func, min_args=0, max_args=None, arg_types=()):
+    """Registers a callable builtin. Arguments past the declared arg_types are passed as is."""
+    builtin_table[name] = Builtin(name, func, min_args, max_args, tuple(arg_types))
+    builtins[name] = func
+
+def builtin_from_function(name, func):
+    """A Builtin for a callable put straight into `builtins`, with the arity of its signature."""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError): # No signature (some C functions): accept any arguments
+        return Builtin(name, func, 0, None, ())
+    positional = [p for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    min_args = sum(1 for p in positional if p.default is p.empty)
+    max_args = None if any(p.kind == p.VAR_POSITIONAL for p in parameters) else len(positional)
+    return Builtin(name, func, min_args, max_args, ())
+
 # --- Populate builtins dictionary ---
-builtins['sqrt'] = _builtin_sqrt
-builtins['pow'] = _builtin_pow
-builtins['random'] = _builtin_random
-builtins['len'] = _builtin_len
-builtins['upper'] = _builtin_upper
-builtins['lower'] = _builtin_lower
-builtins['sub'] = _builtin_sub
-builtins['clock'] = _builtin_clock
-builtins['time'] = _builtin_time
-builtins['type'] = _builtin_type
-builtins['tostring'] = _builtin_tostring
+register_builtin('sqrt', _builtin_sqrt, 0, 1, ('number',))
+register_builtin('pow', _builtin_pow, 0, 2, ('number', 'number'))
+register_builtin('random', _builtin_random, 0, 2, ('number', 'number'))
+register_builtin('len', _builtin_len, 0, 1, ('string',))
+register_builtin('upper', _builtin_upper, 0, 1, ('string',))
+register_builtin('lower', _builtin_lower, 0, 1, ('string',))
+register_builtin('sub', _builtin_sub, 0, 3, ('string', 'number', 'number'))
+register_builtin('clock', _builtin_clock, 0, 0)
+register_builtin('time', _builtin_time, 0, 0)
+register_builtin('type', _builtin_type, 0, 1)
+register_builtin('tostring', _builtin_tostring, 0, 1)
 builtins['pi'] = math.pi # Constant value
 # Expose muser_print
-builtins['muser_print'] = muser_print # Add the python function directly
+register_builtin('muser_print', muser_print) # Add the python function directly
 # --- End Built-ins ---
 
 
-def evaluate_expression(expression_tokens):
+# --- Expression Compiler ---
+# Expressions are compiled once per distinct token list into an evaluator closure
+# (a function of no arguments) and cached, so re-running a statement only calls it.
+# Grammar (lowest to highest precedence):
+#   comparison: ==  ~=  !=  <  >  <=  >=
+#   additive:   +  -
+#   multiplicative: *  /
+#   operand:    ( expression ) | - operand | builtin arg* | single token
+# A builtin call takes every following argument up to the next operator or ')'.
+# A '-' written against a name or '(' (e.g. -x, -sqrt 4, -(x) is negated too.
+# Anything that doesn't parse is kept as the plain string, as before.
+
+BINARY_PRECEDENCE = {
+    '==': 1, '~=': 1, '!=': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '+': 2, '-': 2,
+    '*': 3, '/': 3,
+}
+EXPRESSION_CACHE_SIZE = 1024
+NEGATED_OPERAND = re.compile(r"-(?:[A-Za-z_]|\()") # '-x' or '-(', but not '-5' or '--'
+
+class ExpressionSyntaxError(Exception):
+    """Raised while compiling an expression that doesn't fit the grammar."""
+    pass
+
+def _split_parentheses(tokens):
+    """Splits leading '(' and trailing ')' off tokens, so '(x' and 'y)' work without spaces. 'clock()' stays whole."""
+    split_tokens = []
+    for token in tokens:
+        while len(token) > 1 and token.startswith('('):
+            split_tokens.append('(')
+            token = token[1:]
+        closing = 0
+        while len(token) > 1 and token.endswith(')') and not token.endswith('()'):
+            closing += 1
+            token = token[:-1]
+        split_tokens.append(token)
+        split_tokens.extend(')' * closing)
+    return split_tokens
+
+def _typed_argument(evaluator, arg_type):
+    converter = ARGUMENT_CONVERTERS[arg_type]
+    return lambda: converter(evaluator())
+
+def bind_builtin_call(builtin, arg_evaluators, error_prefix="  ", error_context=""):
     """
-    Evaluates simple expressions from a list of tokens.
-    Handles: Literals, Variables, Constants(pi), Built-in calls, Basic Arithmetic/Comparison.
-    Limitation: No operator precedence, no parentheses, left-to-right for single op.
+    Binds a call site to a builtin once, at compile time: checks the arity, wraps the
+    declared argument conversions and picks a call closure specialised on argument count.
+    error_prefix/error_context shape the error messages (e.g. line info for standalone calls).
     """
-    if not expression_tokens:
-        return None
-
-    muser_debug_print(f" Evaluating expression tokens: {expression_tokens}")
-
-    # --- Function Call Check ---
-    # Handle zero-arg calls like clock() or just clock
-    raw_func_name = expression_tokens[0]
-    func_name = raw_func_name[:-2] if raw_func_name.endswith('()') else raw_func_name
-    func_name = func_name.lower() # Look up builtins case-insensitively
+    name = builtin.name
+    func = builtin.func
+    arg_count = len(arg_evaluators)
+
+    if arg_count < builtin.min_args or (builtin.max_args is not None and arg_count > builtin.max_args):
+        message = (f"{error_prefix}Wrong arguments for function '{name}'{error_context}: "
+                   f"expects {builtin.arity_text()} argument(s), got {arg_count}")
+
+        def evaluate_wrong_arity():
+            for arg in arg_evaluators: # Arguments are still evaluated, as a real call would
+                arg()
+            muser_error_print(message)
+            return None
+        return evaluate_wrong_arity
+
+    args = [_typed_argument(arg, arg_type) if arg_type else arg
+            for arg, arg_type in zip(arg_evaluators, builtin.arg_types)]
+    args.extend(arg_evaluators[len(args):])
+
+    if arg_count == 0:
+        call = func
+    elif arg_count == 1:
+        a, = args
+        call = lambda: func(a())
+    elif arg_count == 2:
+        a, b = args
+        call = lambda: func(a(), b())
+    elif arg_count == 3:
+        a, b, c = args
+        call = lambda: func(a(), b(), c())
+    else:
+        call = lambda: func(*[arg() for arg in args])
 
-    if func_name in builtins and callable(builtins[func_name]):
-        func = builtins[func_name]
-        # Evaluate arguments recursively (handles single-token args well)
-        arg_values = [evaluate_expression([arg]) for arg in expression_tokens[1:]]
-        muser_debug_print(f"  Calling built-in '{func_name}' with args: {arg_values}")
+    def evaluate_call():
         try:
-            return func(*arg_values)
-        except TypeError as e:
-             muser_error_print(f"  Wrong arguments for function '{func_name}': {e}")
-             return None
+            if logging_enabled:
+                arg_values = [arg() for arg in args]
+                muser_log("call", "  Calling built-in '{name}' with args: {args}", name=name, args=arg_values)
+                return func(*arg_values)
+            return call()
         except Exception as e:
-             muser_error_print(f"  Error executing function '{func_name}': {e}")
+             muser_error_print(f"{error_prefix}Error executing function '{name}'{error_context}: {e}")
              return None
+    return evaluate_call
 
-    # --- Single Token Evaluation (Base cases) ---
-    if len(expression_tokens) == 1:
-        token = expression_tokens[0]
-        # Strip () if it's the only token, e.g., evaluate_expression(['clock()'])
-        if token.endswith('()'):
-             token = token[:-2]
-        token_lower = token.lower()
-
-        if token_lower == "true": return True
-        if token_lower == "false": return False
-        if token_lower == "nil" or token_lower == "none": return None
-        if token in variables: return variables[token]
-        if token_lower in builtins and not callable(builtins[token_lower]): # Check constants like pi
-             return builtins[token_lower]
-
-        # Try converting to number
-        num_val = _convert_to_num(token)
-        if num_val is not None: return num_val
-
-        # Fallback: string literal or unknown variable (return as string)
-        muser_debug_print(f"  Single token '{token}' evaluated as string (or unknown var).")
-        return token
-
-    # --- Simple Arithmetic (+, -, *, /) ---
-    if len(expression_tokens) == 3 and expression_tokens[1] in ['+', '-', '*', '/']:
-        left_val = evaluate_expression([expression_tokens[0]]) # Evaluate left operand
-        right_val = evaluate_expression([expression_tokens[2]]) # Evaluate right operand
-        op = expression_tokens[1]
-        muser_debug_print(f"  Arithmetic: {left_val} {op} {right_val}")
+def _compile_arithmetic(op, left, right):
+    def evaluate_arithmetic():
+        left_val = left()
+        right_val = right()
+        if logging_enabled:
+            muser_log("arithmetic", "  Arithmetic: {left} {op} {right}", left=left_val, op=op, right=right_val)
 
         num_left = _convert_to_num(left_val)
         num_right = _convert_to_num(right_val)
@@ -180,358 +349,612 @@ def evaluate_expression(expression_tokens):
             if op == '+': return num_left + num_right
             if op == '-': return num_left - num_right
             if op == '*': return num_left * num_right
-            if op == '/':
-                if num_right == 0: muser_error_print("  Division by zero."); return None
-                return num_left / num_right # Float division
+            if num_right == 0: muser_error_print("  Division by zero."); return None
+            return num_left / num_right # Float division
         except Exception as e:
             muser_error_print(f"  Error during arithmetic {num_left} {op} {num_right}: {e}")
             return None
+    return evaluate_arithmetic
 
-    # --- Simple Comparison (==, ~=, !=, <, >, <=, >=) ---
-    if len(expression_tokens) == 3 and expression_tokens[1] in ['==', '~=', '!=', '<', '>', '<=', '>=']:
-        left = evaluate_expression([expression_tokens[0]])
-        right = evaluate_expression([expression_tokens[2]])
-        op = expression_tokens[1]
-        muser_debug_print(f"  Comparison: {left} {op} {right}")
-
-        if op == '~=': op = '!=' # Treat ~= as !=
+def _compile_comparison(op, left, right):
+    if op == '~=': op = '!=' # Treat ~= as !=
 
+    def evaluate_comparison():
+        left_val = left()
+        right_val = right()
+        if logging_enabled:
+            muser_log("comparison", "  Comparison: {left} {op} {right}", left=left_val, op=op, right=right_val)
         try:
-            if op == '==': return left == right
-            if op == '!=': return left != right
+            if op == '==': return left_val == right_val
+            if op == '!=': return left_val != right_val
             # Numeric comparisons need numbers for remaining ops
-            num_left = _convert_to_num(left)
-            num_right = _convert_to_num(right)
+            num_left = _convert_to_num(left_val)
+            num_right = _convert_to_num(right_val)
             if num_left is None or num_right is None:
                  # Comparing non-numbers with <, >, etc. is generally false
-                 muser_debug_print(f"  Comparison '{op}' requires numbers, got '{left}' and '{right}'. Result: false.")
+                 if logging_enabled:
+                     muser_log("comparison_false", "  Comparison '{op}' requires numbers, got '{left}' and '{right}'. Result: false.", op=op, left=left_val, right=right_val)
                  return False
             if op == '<': return num_left < num_right
             if op == '>': return num_left > num_right
             if op == '<=': return num_left <= num_right
-            if op == '>=': return num_left >= num_right
+            return num_left >= num_right
         except Exception as e: # Catch potential TypeErrors during comparison
-            muser_error_print(f"  Type error during comparison {left} {op} {right}: {e}")
+            muser_error_print(f"  Type error during comparison {left_val} {op} {right_val}: {e}")
             return False # Comparing incompatible types is false
+    return evaluate_comparison
+
+def _compile_negation(operand, token, variables):
+    """Negates an operand written as one token like '-x'. Non-numbers stay the token text, as before."""
+    def evaluate_negation():
+        if token in variables: return variables[token]
+        value = _convert_to_num(operand())
+        return -value if value is not None else token
+    return evaluate_negation
+
+class _ExpressionParser:
+    """Precedence-climbing parser that turns a token list into an evaluator closure."""
+    def __init__(self, interpreter, tokens):
+        self.interpreter = interpreter # Resolves builtins and single tokens
+        self.tokens = _split_parentheses(tokens)
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise ExpressionSyntaxError("Unexpected end of expression")
+        self.pos += 1
+        return token
 
-    # --- Fallback ---
-    # If it's not a single value, function call, arithmetic, or comparison,
-    # treat the whole thing as an unevaluated string for now.
-    result = " ".join(expression_tokens)
-    muser_debug_print(f"  Expression '{result}' evaluated as string (fallback).")
-    return result
+    def parse(self):
+        evaluator = self._parse_binary(1)
+        if self.pos != len(self.tokens):
+            raise ExpressionSyntaxError(f"Unexpected token '{self._peek()}'")
+        return evaluator
+
+    def _parse_binary(self, min_precedence):
+        left = self._parse_operand()
+        while True:
+            op = self._peek()
+            precedence = BINARY_PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.pos += 1
+            right = self._parse_binary(precedence + 1) # All operators are left-associative
+            if precedence == 1:
+                left = _compile_comparison(op, left, right)
+            else:
+                left = _compile_arithmetic(op, left, right)
+
+    def _parse_operand(self):
+        token = self._next()
+        if token == '(':
+            evaluator = self._parse_binary(1)
+            if self._next() != ')':
+                raise ExpressionSyntaxError("Expected ')'")
+            return evaluator
+        if token == '-':
+            return _compile_arithmetic('-', lambda: 0, self._parse_operand())
+        if NEGATED_OPERAND.match(token):
+            # Put the operand back as its own token(s) and parse it
+            self.tokens[self.pos - 1:self.pos] = _split_parentheses([token[1:]])
+            self.pos -= 1
+            return _compile_negation(self._parse_operand(), token, self.interpreter.variables)
+        if token in BINARY_PRECEDENCE or token == ')':
+            raise ExpressionSyntaxError(f"Unexpected token '{token}'")
+
+        builtin = self.interpreter.callable_builtin(token)
+        if builtin is not None and not token.endswith('()'):
+            # Builtin call: arguments run up to the next operator or ')'
+            arg_evaluators = []
+            while self._peek() is not None and self._peek() not in BINARY_PRECEDENCE and self._peek() != ')':
+                arg_evaluators.append(self._parse_argument())
+            return bind_builtin_call(builtin, arg_evaluators)
+        return self.interpreter.compile_token(token)
+
+    def _parse_argument(self):
+        token = self._next()
+        if token == '(':
+            evaluator = self._parse_binary(1)
+            if self._next() != ')':
+                raise ExpressionSyntaxError("Expected ')'")
+            return evaluator
+        return self.interpreter.compile_token(token)
 
 
 # --- Interpreter and Parser ---
 
-def interpreter(tokens, line_number=None):
-    """Interprets a single command token list."""
-    global variables
-    if not tokens:
-        return  # Skip empty lines/tokens
+def _strip_comment_args(args):
+    """Drops everything from the first '#' on (a '#' inside a token keeps the part before it)."""
+    filtered_args = []
+    for arg in args:
+        if "#" in arg:
+            arg_parts = arg.split("#", 1)
+            if arg_parts[0]:
+                filtered_args.append(arg_parts[0].strip())
+            break
+        else:
+            filtered_args.append(arg)
+    return filtered_args
+
+def _tokenize_line(line, line_number):
+    """shlex-splits one line. Returns None (after reporting) on tokenization errors."""
+    try:
+        return shlex.split(line)
+    except ValueError as e:
+        muser_error_print(f"Tokenization error on line {line_number}: {e}")
+        return None
 
-    # Filter out comment tokens
-    active_tokens = [token for token in tokens if not token.startswith("#")]
+# Programs are compiled once into a list of statements, which are then executed.
+# Block bodies (if/else, loop) are compiled into nested statement lists, so a
+# loop runs its body directly instead of re-splitting and re-tokenizing it.
+# Conditions, loop counts and 'let' values are compiled expression evaluators.
+#   ("line", tokens, line_number)
+#   ("let", variable_name, value_evaluator, line_number)
+#   ("call", call_evaluator, line_number)       builtin used as a command
+#   ("if", condition_evaluator, then_statements, else_statements, line_number)
+#   ("loop", count_evaluator, body_statements, line_number)
+
+class InmInterpreter:
+    """
+    One INM interpreter with its own variables, builtins and output sink.
+    Instances share nothing mutable, so many can run side by side (e.g. one per
+    thread in a pool). Compiled expressions are cached per instance because they
+    are bound to its variables and builtins.
+    shared_builtins=True uses the module's builtins/builtin_table instead of copies,
+    so later module-level registrations reach it (the default interpreter does this).
+    """
+    def __init__(self, output=None, variables=None, shared_builtins=False):
+        self.variables = variables if variables is not None else {}
+        if shared_builtins:
+            self.builtins = builtins
+            self.builtin_table = builtin_table
+        else:
+            # Copies of the module defaults; register_builtin() on the instance only affects it
+            self.builtins = BuiltinDict(builtins)
+            self.builtin_table = dict(builtin_table)
+        self.output = output # Any object with write(); None means sys.stdout
+        self._compile_cached = lru_cache(maxsize=EXPRESSION_CACHE_SIZE)(self._compile_expression)
+        self._builtins_version = self.builtins.version
+
+    @property
+    def output(self):
+        return self._output
+
+    @output.setter
+    def output(self, stream):
+        if getattr(self, "renderer", None) is not None:
+            self.renderer.flush()
+        self._output = stream
+        self.renderer = make_renderer(stream) if stream is not None else _default_renderer
+
+    def register_builtin(self, name, func, min_args=0, max_args=None, arg_types=()):
+        """Registers a builtin for this interpreter only (see the module-level register_builtin)."""
+        self.builtin_table[name] = Builtin(name, func, min_args, max_args, tuple(arg_types))
+        self.builtins[name] = func
+        self._compile_cached.cache_clear() # Cached call sites may be bound to the old builtin
+
+    # --- Entry points ---
+    def run(self, code):
+        """Compiles the code into statements (blocks parsed once) and executes them."""
+        active = _active_renderer.set(self.renderer)
+        try:
+            muser_print("Parser Started.")
+            self.execute_statements(self.compile_program(code))
+            muser_print("Parser Finished.")
+        finally:
+            _active_renderer.reset(active)
+            self.renderer.flush()
+
+    def evaluate(self, expression_tokens):
+        """Evaluates one expression (a token list) with output going to this interpreter's sink."""
+        active = _active_renderer.set(self.renderer)
+        try:
+            return self.evaluate_expression(expression_tokens)
+        finally:
+            _active_renderer.reset(active)
+            self.renderer.flush()
+
+    # --- Expressions ---
+    def callable_builtin(self, token):
+        """Returns the Builtin a token names (case-insensitive, optional '()'), or None for constants and non-builtins."""
+        name = (token[:-2] if token.endswith('()') else token).lower()
+        builtin = self.builtin_table.get(name)
+        value = self.builtins.get(name, builtin.func if builtin is not None else None)
+        if builtin is None or builtin.func is not value:
+            if not callable(value):
+                return None
+            # Set straight in the builtins dict (the old extension point): register it now
+            builtin = self.builtin_table[name] = builtin_from_function(name, value)
+        return builtin
+
+    def compile_token(self, token):
+        """Compiles a single token: builtin call, keyword, variable, constant, number or string."""
+        builtin = self.callable_builtin(token)
+        if builtin is not None:
+            return bind_builtin_call(builtin, [])
+
+        # Strip () if it's the only token, e.g. 'x()'
+        if token.endswith('()'):
+            token = token[:-2]
+        token_lower = token.lower()
+        if token_lower == "true": return lambda: True
+        if token_lower == "false": return lambda: False
+        if token_lower == "nil" or token_lower == "none": return lambda: None
+
+        # Variables are looked up at run time and win over everything else;
+        # otherwise the value is fixed: constant (pi), number or string literal
+        if token_lower in self.builtins: # Constants like pi (callables were handled above)
+            fallback = self.builtins[token_lower]
+        else:
+            fallback = _convert_to_num(token)
+            if fallback is None:
+                fallback = token
+        is_string = fallback is token
+        variables = self.variables
+
+        def evaluate_token():
+            if token in variables: return variables[token]
+            if is_string and logging_enabled:
+                muser_log("string", "  Single token '{token}' evaluated as string (or unknown var).", token=token)
+            return fallback
+        return evaluate_token
+
+    def compile_expression(self, expression_tokens):
+        """Returns the cached evaluator for a tuple of tokens, recompiling if builtins changed since."""
+        if self.builtins.version != self._builtins_version: # Registered, or set straight in the builtins dict
+            self._builtins_version = self.builtins.version
+            self._compile_cached.cache_clear()
+        return self._compile_cached(expression_tokens)
+
+    def _compile_expression(self, expression_tokens):
+        """Compiles a tuple of tokens into an evaluator closure. Called through the per-instance cache."""
+        if not expression_tokens:
+            return lambda: None
+        try:
+            return _ExpressionParser(self, expression_tokens).parse()
+        except ExpressionSyntaxError:
+            # Not an expression: treat the whole thing as an unevaluated string
+            result = " ".join(expression_tokens)
+
+            def evaluate_fallback():
+                if logging_enabled:
+                    muser_log("string", "  Expression '{result}' evaluated as string (fallback).", result=result)
+                return result
+            return evaluate_fallback
+
+    def evaluate_expression(self, expression_tokens):
+        """
+        Evaluates an expression given as a list of tokens.
+        Handles: Literals, Variables, Constants(pi), Built-in calls, Arithmetic/Comparison
+        with precedence and parentheses. Compiled evaluators are cached per token list.
+        """
+        if logging_enabled:
+            muser_log("evaluate", " Evaluating expression tokens: {tokens}", tokens=expression_tokens)
+        return self.compile_expression(tuple(expression_tokens))()
+
+    def compile_standalone_call(self, builtin, args, line_number):
+        """Binds a builtin used as a command, e.g. 'muser_print Hello'. Each argument is a single token."""
+        arg_evaluators = [self.compile_token(arg) for arg in _strip_comment_args(args)]
+        return bind_builtin_call(builtin, arg_evaluators, " ", f" on line {line_number} (standalone call)")
+
+    # --- Single commands ---
+    def interpreter(self, tokens, line_number=None):
+        """Interprets a single command token list."""
+        variables = self.variables
+        if not tokens:
+            return  # Skip empty lines/tokens
 
-    if not active_tokens:
-        return  # Treat lines with only comments as empty
+        # Filter out comment tokens
+        active_tokens = [token for token in tokens if not token.startswith("#")]
 
-    command = active_tokens[0].lower()
-    args = active_tokens[1:]
+        if not active_tokens:
+            return  # Treat lines with only comments as empty
 
-    muser_debug_print(f"Interpreting: Command='{command}', Args={args} (Line: {line_number})")
+        command = active_tokens[0].lower()
+        args = active_tokens[1:]
 
-    if command == "print":
-        filtered_args = []
-        for arg in args:
-            if "#" in arg:
-                arg_parts = arg.split("#", 1)
-                if arg_parts[0]:
-                    filtered_args.append(arg_parts[0].strip())
-                break
-            else:
-                filtered_args.append(arg)
+        if logging_enabled:
+            muser_log("command", "Interpreting: Command='{command}', Args={args} (Line: {line})", command=command, args=args, line=line_number)
 
-        output_parts = []
-        i = 0
-        while i < len(filtered_args):
-            expr_tokens = []
+        if command == "print":
+            filtered_args = _strip_comment_args(args)
+
+            output_parts = []
+            i = 0
             while i < len(filtered_args):
-                expr_tokens.append(filtered_args[i])
-                if len(expr_tokens) > 0 and i + 1 < len(filtered_args) and filtered_args[i + 1] not in ['+', '-', '*', '/', '==', '~=', '!=', '<', '>', '<=', '>=']:
-                    try:
-                        evaluated = evaluate_expression(expr_tokens)
-                        if evaluated is not None:
-                            output_parts.append(_builtin_tostring(evaluated))
+                expr_tokens = []
+                while i < len(filtered_args):
+                    expr_tokens.append(filtered_args[i])
+                    if len(expr_tokens) > 0 and i + 1 < len(filtered_args) and filtered_args[i + 1] not in ['+', '-', '*', '/', '==', '~=', '!=', '<', '>', '<=', '>=']:
+                        try:
+                            evaluated = self.evaluate_expression(expr_tokens)
+                            if evaluated is not None:
+                                output_parts.append(_builtin_tostring(evaluated))
+                                i += 1
+                                break
+                        except Exception as e:
+                            muser_error_print(f"Error evaluating expression '{' '.join(expr_tokens)}' on line {line_number} (within print): {e}")
+                            output_parts.append(f"[Error: {e}]")  # Output error in the print
                             i += 1
                             break
-                    except Exception as e:
-                        muser_error_print(f"Error evaluating expression '{' '.join(expr_tokens)}' on line {line_number} (within print): {e}")
-                        output_parts.append(f"[Error: {e}]")  # Output error in the print
-                        i += 1
-                        break
-                i += 1
-            else:
-                if expr_tokens:
-                    try:
-                        output_parts.append(_builtin_tostring(evaluate_expression(expr_tokens)))
-                    except Exception as e:
-                        muser_error_print(f"Error evaluating expression '{' '.join(expr_tokens)}' on line {line_number} (within print): {e}")
-                        output_parts.append(f"[Error: {e}]")
-        muser_output_print(" ".join(output_parts))
-        # --- End of Print ---
-
-    elif command == "let":
-        filtered_args = []
-        for arg in args:
-            if "#" in arg:
-                arg_parts = arg.split("#", 1)
-                if arg_parts[0]:
-                    filtered_args.append(arg_parts[0].strip())
-                break
-            else:
-                filtered_args.append(arg)
-
-        if len(filtered_args) >= 3 and filtered_args[1] == "=":
-            variable_name = filtered_args[0]
-            value_tokens = filtered_args[2:]
-            try:
-                variable_value = evaluate_expression(value_tokens)
-                variables[variable_name] = variable_value
-                muser_debug_print(f"Variable Set: {variable_name} = {variable_value} ({type(variable_value)}) (Line: {line_number})")
-            except Exception as e:
-                muser_error_print(f"Error evaluating expression for 'let {variable_name}' on line {line_number} (within let): {e}")
-        elif len(filtered_args) == 1 and filtered_args[0].endswith('='):
-            variable_name = filtered_args[0][:-1].strip()
-            if variable_name:
-                variables[variable_name] = None
-                muser_debug_print(f"Variable Set: {variable_name} = None (Line: {line_number})")
+                    i += 1
+                else:
+                    if expr_tokens:
+                        try:
+                            output_parts.append(_builtin_tostring(self.evaluate_expression(expr_tokens)))
+                        except Exception as e:
+                            muser_error_print(f"Error evaluating expression '{' '.join(expr_tokens)}' on line {line_number} (within print): {e}")
+                            output_parts.append(f"[Error: {e}]")
+            muser_output_print(" ".join(output_parts))
+            # --- End of Print ---
+
+        elif command == "let":
+            filtered_args = _strip_comment_args(args)
+
+            if len(filtered_args) >= 3 and filtered_args[1] == "=":
+                variable_name = filtered_args[0]
+                value_tokens = filtered_args[2:]
+                try:
+                    variable_value = self.evaluate_expression(value_tokens)
+                    variables[variable_name] = variable_value
+                    if logging_enabled:
+                        muser_log("set", "Variable Set: {name} = {value} ({value_type}) (Line: {line})", name=variable_name, value=variable_value, value_type=type(variable_value), line=line_number)
+                except Exception as e:
+                    muser_error_print(f"Error evaluating expression for 'let {variable_name}' on line {line_number} (within let): {e}")
+            elif len(filtered_args) == 1 and filtered_args[0].endswith('='):
+                variable_name = filtered_args[0][:-1].strip()
+                if variable_name:
+                    variables[variable_name] = None
+                    if logging_enabled:
+                        muser_log("set", "Variable Set: {name} = None (Line: {line})", name=variable_name, line=line_number)
+                else:
+                    muser_error_print(f"Syntax error: Invalid 'let' statement on line {line_number}: {' '.join(tokens)}")
+            elif len(filtered_args) == 2 and filtered_args[1] == '=':
+                variables[filtered_args[0]] = None
+                if logging_enabled:
+                    muser_log("set", "Variable Set: {name} = None (Line: {line})", name=filtered_args[0], line=line_number)
             else:
                 muser_error_print(f"Syntax error: Invalid 'let' statement on line {line_number}: {' '.join(tokens)}")
-        elif len(filtered_args) == 2 and filtered_args[1] == '=':
-            variables[filtered_args[0]] = None
-            muser_debug_print(f"Variable Set: {filtered_args[0]} = None (Line: {line_number})")
-        else:
-            muser_error_print(f"Syntax error: Invalid 'let' statement on line {line_number}: {' '.join(tokens)}")
-
-    elif command == "loop":
-        if len(args) >= 2 and args[-1].lower() == "do":
-            count_tokens = args[:-1]  # Everything before 'do' is the count expression
-            evaluated_count = evaluate_expression(count_tokens)
-
-            if not isinstance(evaluated_count, (int, float)):
-                muser_error_print(f"Error: Loop count must be a number on line {line_number}.")
-                return
-
-            integer_count = int(evaluated_count)
-
-            if integer_count < 0:
-                muser_debug_print(f"Someone used loop on line {line_number} with negative integer {integer_count}, not looping =)")
-                return
-            elif integer_count == 0:
-                muser_debug_print(f"Someone used loop on line {line_number} with integer 0, not looping =)")
-                return
-            elif integer_count == 1:
-                muser_debug_print(f"Hey, you have {integer_count} iteration on line {line_number}, why not using the code directly without a loop?")
-                # --- Retrieve and execute the loop body once ---
-                loop_body_tokens_list = args[:-2]
-                if isinstance(loop_body_tokens_list, list):
-                    muser_debug_print(f"Executing loop body once.")
-                    for body_token_list in loop_body_tokens_list:
-                        interpreter(body_token_list, line_number)
-                # --- End of single execution ---
-            else:
-                # --- Retrieve and execute the loop body multiple times ---
-                loop_body_tokens_list = args[:-2]
-                if isinstance(loop_body_tokens_list, list):
-                    muser_debug_print(f"Someone used loop on line {line_number} with integer {integer_count}, looping {integer_count} times.")
-                    for _ in range(integer_count):
+
+        elif command == "loop":
+            if len(args) >= 2 and args[-1].lower() == "do":
+                count_tokens = args[:-1]  # Everything before 'do' is the count expression
+                evaluated_count = self.evaluate_expression(count_tokens)
+
+                if not isinstance(evaluated_count, (int, float)):
+                    muser_error_print(f"Error: Loop count must be a number on line {line_number}.")
+                    return
+
+                integer_count = int(evaluated_count)
+
+                if integer_count < 0:
+                    if logging_enabled:
+                        muser_log("loop_skip", "Someone used loop on line {line} with negative integer {count}, not looping =)", line=line_number, count=integer_count)
+                    return
+                elif integer_count == 0:
+                    if logging_enabled:
+                        muser_log("loop_skip", "Someone used loop on line {line} with integer 0, not looping =)", line=line_number, count=integer_count)
+                    return
+                elif integer_count == 1:
+                    if logging_enabled:
+                        muser_log("loop", "Hey, you have {count} iteration on line {line}, why not using the code directly without a loop?", line=line_number, count=integer_count)
+                    # --- Retrieve and execute the loop body once ---
+                    loop_body_tokens_list = args[:-2]
+                    if isinstance(loop_body_tokens_list, list):
                         for body_token_list in loop_body_tokens_list:
-                            interpreter(body_token_list, line_number)
-                # --- End of loop execution ---
-        else:
-            muser_error_print(f"Syntax error: Invalid 'loop' statement on line {line_number}. Expected 'loop <count> do'.")
-
-    # Check for built-in function calls AS commands (side effects, ignore result)
-    elif command in builtins:
-        func = builtins[command]
-        if callable(func):
-            filtered_args_func = []
-            for arg in args:
-                if "#" in arg:
-                    arg_parts = arg.split("#", 1)
-                    if arg_parts[0]:
-                        filtered_args_func.append(arg_parts[0].strip())
-                    break
+                            self.interpreter(body_token_list, line_number)
+                    # --- End of single execution ---
                 else:
-                    filtered_args_func.append(arg)
-            arg_values = [evaluate_expression([arg]) for arg in filtered_args_func]  # Eval each arg token individually
-            muser_debug_print(f" Calling standalone built-in '{command}' with arg values: {arg_values} (Line: {line_number})")
-            try:
-                func(*arg_values)  # Execute, ignore result
-            except TypeError as e:
-                muser_error_print(f" Wrong arguments for function '{command}' on line {line_number} (standalone call): {e}")
-            except Exception as e:
-                muser_error_print(f" Error executing function '{command}' on line {line_number} (standalone call): {e}")
-        else:
-            # Accessing a constant like 'pi' as a command makes no sense
-            muser_error_print(f"Cannot execute non-function built-in '{command}' as a command on line {line_number}.")
-
-    elif command in ["if", "else", "end", "then"]:
-        pass  # Handled by parser
-    else:
-        muser_error_print(f"Unknown command: {tokens[0]} on line {line_number}")
+                    # --- Retrieve and execute the loop body multiple times ---
+                    loop_body_tokens_list = args[:-2]
+                    if isinstance(loop_body_tokens_list, list):
+                        if logging_enabled:
+                            muser_log("loop", "Someone used loop on line {line} with integer {count}, looping {count} times.", line=line_number, count=integer_count)
+                        for _ in range(integer_count):
+                            for body_token_list in loop_body_tokens_list:
+                                self.interpreter(body_token_list, line_number)
+                    # --- End of loop execution ---
+            else:
+                muser_error_print(f"Syntax error: Invalid 'loop' statement on line {line_number}. Expected 'loop <count> do'.")
 
+        # Check for built-in function calls AS commands (side effects, ignore result)
+        elif command in self.builtins:
+            builtin = self.callable_builtin(command)
+            if builtin is not None:
+                self.compile_standalone_call(builtin, args, line_number)()  # Execute, ignore result
+            else:
+                # Accessing a constant like 'pi' as a command makes no sense
+                muser_error_print(f"Cannot execute non-function built-in '{command}' as a command on line {line_number}.")
 
-def parser(code):
-    """Parses and executes the code line by line, handling simple blocks."""
-    muser_print("Parser Started.")
-    lines = code.strip().splitlines()
-    i = 0
-    while i < len(lines):
-        line_number = i + 1
-        line = lines[i].strip()
-        muser_debug_print(f"Parsing Line {line_number}: '{line}'")
-
-        if not line or line.startswith("#"):
+        elif command in ["if", "else", "end", "then"]:
+            pass  # Handled by parser
+        else:
+            muser_error_print(f"Unknown command: {tokens[0]} on line {line_number}")
+
+    # --- Block compiler ---
+    def _compile_block(self, lines, i, block_start=None):
+        """
+        Compiles lines[i:] into statements until the block's closing 'end' (or an 'else'
+        belonging to it). Returns (statements, next_index, terminator) where terminator
+        is 'end', 'else' or None when the code ran out.
+        """
+        statements = []
+        while i < len(lines):
+            line_number = i + 1
+            line = lines[i].strip()
             i += 1
-            continue
 
-        try:
-            tokens = shlex.split(line)
-        except ValueError as e:
-            muser_error_print(f"Tokenization error on line {line_number}: {e}")
-            i += 1
-            continue
-        if not tokens:
-            i += 1
-            continue
+            if not line or line.startswith("#"):
+                continue
+            tokens = _tokenize_line(line, line_number)
+            if not tokens:
+                continue
 
-        command = tokens[0].lower()
+            command = tokens[0].lower()
+            if block_start is not None and command in ("end", "else"):
+                return statements, i, command
 
-        try:  # Add error handling around processing each line/block
             if command == "if":
-                # --- Refined If/Else Block Handling ---
                 if len(tokens) >= 3 and tokens[-1].lower() == "then":
-                    condition_tokens = tokens[1:-1]
-                    muser_debug_print(f" IF condition tokens: {condition_tokens}")
-                    condition_value = evaluate_expression(condition_tokens)
-                    muser_debug_print(f" IF condition value: {condition_value}")
-
-                    then_block_lines = []
-                    else_block_lines = []
-                    current_block = then_block_lines
-                    block_level = 1
-                    if_start_line = line_number
-                    j = i + 1
-                    found_end = False
-                    while j < len(lines):
-                        block_line = lines[j]
-                        block_line_strip = block_line.strip()
-                        block_tokens = []
-                        if block_line_strip:
-                            try:
-                                block_tokens = shlex.split(block_line_strip)
-                            except ValueError as e:
-                                muser_error_print(f"Tokenization error within IF block on line {j + 1}: {e}")
-                                pass
-
-                        block_command = block_tokens[0].lower() if block_tokens else ""
-                        muser_debug_print(f"  Scanning L{j + 1}: '{block_line_strip}' -> Cmd='{block_command}', Level={block_level}")
-
-                        if block_command == "if":
-                            block_level += 1
-                        elif block_command == "else" and block_level == 1:
-                            current_block = else_block_lines
-                        elif block_command == "end":
-                            block_level -= 1
-                            if block_level == 0:
-                                found_end = True
-                                break
-
-                        # Add line to the correct block (unless it's the 'else'/'end' keyword itself at level 1)
-                        if not (block_level == 0 or (block_level == 1 and block_command in ["else", "end"])):
-                            current_block.append(block_line)
-                        j += 1
-
-                    if not found_end:
-                        muser_error_print(f"Syntax Error: Missing 'end' for 'if' block starting on line {if_start_line}.")
-                        i = len(lines)  # Stop parsing
-                    else:
-                        muser_debug_print(f" IF block found: THEN lines={len(then_block_lines)}, ELSE lines={len(else_block_lines)}, Ends line {j + 1}")
-                        if condition_value:
-                            muser_debug_print("Executing THEN block...")
-                            parser("\n".join(then_block_lines))  # Recursive call
-                        elif else_block_lines:
-                            muser_debug_print("Executing ELSE block...")
-                            parser("\n".join(else_block_lines))  # Recursive call
-                        i = j  # Move main index past the 'end' line
+                    then_statements, i, terminator = self._compile_block(lines, i, line_number)
+                    else_statements = []
+                    if terminator == "else":
+                        else_statements, i, terminator = self._compile_block(lines, i, line_number)
+                        while terminator == "else": # A stray second 'else' is ignored, like before
+                            more_statements, i, terminator = self._compile_block(lines, i, line_number)
+                            else_statements.extend(more_statements)
+                    if terminator is None:
+                        muser_error_print(f"Syntax Error: Missing 'end' for 'if' block starting on line {line_number}.")
+                        return statements, len(lines), None
+                    condition = self.compile_expression(tuple(tokens[1:-1]))
+                    statements.append(("if", condition, then_statements, else_statements, line_number))
                 else:
                     muser_error_print(f"Syntax error: Invalid 'if' statement on line {line_number}: '{line}'")
-                    i += 1
-                # --- End of If/Else Handling ---
             elif command == "loop":
                 if len(tokens) >= 2 and tokens[-1].lower() == "do":
-                    count_tokens = tokens[1:-1]
-                    try:
-                        evaluated_count = evaluate_expression(count_tokens)
-                        if not isinstance(evaluated_count, (int, float)):
-                            muser_error_print(f"Error: Loop count must be a number on line {line_number}.")
-                        else:
-                            integer_count = int(evaluated_count)
-                            if integer_count < 0:
-                                muser_debug_print(f"Someone used loop on line {line_number} with negative integer {integer_count}, not looping =)")
-                            elif integer_count == 0:
-                                muser_debug_print(f"Someone used loop on line {line_number} with integer 0, not looping =)")
-                            elif integer_count == 1:
-                                muser_debug_print(f"Hey, you have {integer_count} iteration on line {line_number}, why not using the code directly without a loop?")
-                                # Execute the next lines directly
-                                k = i + 1
-                                while k < len(lines) and lines[k].strip().lower() != "end":
-                                    parser(lines[k])
-                                    k += 1
-                                i = k # Move past the 'end'
-                            elif integer_count > 1:
-                                muser_debug_print(f"Someone used loop on line {line_number} with integer {integer_count}, preparing to loop.")
-                                loop_body_lines = []
-                                loop_start_line = line_number
-                                k = i + 1
-                                end_found = False
-                                while k < len(lines):
-                                    body_line = lines[k]
-                                    if body_line.strip().lower() == "end":
-                                        end_found = True
-                                        break
-                                    loop_body_lines.append(body_line)
-                                    k += 1
-
-                                if not end_found:
-                                    muser_error_print(f"Syntax Error: Missing 'end' for 'loop' on line {loop_start_line}.")
-                                else:
-                                    muser_debug_print(f"Loop body found, executing {integer_count} times.")
-                                    for _ in range(integer_count):
-                                        muser_debug_print(f"--- Loop Iteration {_ + 1} (starting at line {loop_start_line + 1}) ---")
-                                        parser("\n".join(loop_body_lines)) # Recursive call for the loop body
-                                    i = k # Move past the 'end'
-                            else:
-                                    i += 1 # Move to the next line if 'end' is missing
-                    except Exception as e:
-                        muser_error_print(f"Error evaluating loop count on line {line_number}: {e}")
-                        i += 1
+                    body_statements, i, terminator = self._compile_block(lines, i, line_number)
+                    if terminator is None:
+                        muser_error_print(f"Syntax Error: Missing 'end' for 'loop' on line {line_number}.")
+                        return statements, len(lines), None
+                    if terminator == "else":
+                        muser_error_print(f"Syntax Error: 'else' inside 'loop' on line {line_number}.")
+                        _, i, _ = self._compile_block(lines, i, line_number) # Skip to the loop's 'end'
+                    statements.append(("loop", self.compile_expression(tuple(tokens[1:-1])), body_statements, line_number))
                 else:
                     muser_error_print(f"Syntax error: Invalid 'loop' statement on line {line_number}. Expected 'loop <count> do'.")
-                    i += 1
+            elif command == "let":
+                # Same argument filtering as interpreter(): '#' tokens dropped, then cut at a '#' inside a token
+                let_args = _strip_comment_args([token for token in tokens[1:] if not token.startswith("#")])
+                if len(let_args) >= 3 and let_args[1] == "=":
+                    statements.append(("let", let_args[0], self.compile_expression(tuple(let_args[2:])), line_number))
+                else:
+                    statements.append(("line", tokens, line_number)) # 'let x =' forms and syntax errors
+            elif command in self.builtins and self.callable_builtin(command) is not None:
+                args = [token for token in tokens[1:] if not token.startswith("#")]
+                statements.append(("call", self.compile_standalone_call(self.callable_builtin(command), args, line_number), line_number))
             else:
-                interpreter(tokens, line_number)  # Handle other commands
-                i += 1
+                statements.append(("line", tokens, line_number))
+        return statements, i, None
+
+    def compile_program(self, code):
+        """Compiles source code into a statement list (see above). Syntax errors are reported here."""
+        statements, _, _ = self._compile_block(code.strip().splitlines(), 0)
+        return statements
+
+    # --- Execution ---
+    def execute_statements(self, statements):
+        """Executes a compiled statement list."""
+        for statement in statements:
+            kind = statement[0]
+            line_number = statement[-1]
+            try:  # Add error handling around each statement/block
+                if kind == "line":
+                    self.interpreter(statement[1], line_number)  # Handle other commands
+                elif kind == "let":
+                    self._execute_let(statement[1], statement[2], line_number)
+                elif kind == "call":
+                    statement[1]()
+                elif kind == "if":
+                    condition_value = statement[1]()
+                    if logging_enabled:
+                        muser_log("if", " IF condition value: {value} (Line: {line})", value=condition_value, line=line_number)
+                    if condition_value:
+                        self.execute_statements(statement[2])
+                    elif statement[3]:
+                        self.execute_statements(statement[3])
+                else:  # loop
+                    self._execute_loop(statement[1], statement[2], line_number)
+            except Exception as e:
+                muser_error_print(f"--- Runtime Error on line {line_number} ---")
+                muser_error_print(f"Error: {e}")
+                self.renderer.flush() # Keep the traceback after the messages
+                traceback.print_exc(file=self.output)
+
+    def _execute_let(self, variable_name, value_evaluator, line_number):
+        try:
+            variable_value = value_evaluator()
+        except Exception as e:
+            muser_error_print(f"Error evaluating expression for 'let {variable_name}' on line {line_number} (within let): {e}")
+            return
+        self.variables[variable_name] = variable_value
+        if logging_enabled:
+            muser_log("set", "Variable Set: {name} = {value} ({value_type}) (Line: {line})", name=variable_name, value=variable_value, value_type=type(variable_value), line=line_number)
+
+    def _execute_loop(self, count_evaluator, body_statements, line_number):
+        try:
+            evaluated_count = count_evaluator()
         except Exception as e:
-            muser_error_print(f"--- Runtime Error on line {line_number} ---")
-            muser_error_print(f"Line: '{line}'")
-            muser_error_print(f"Error: {e}")
-            traceback.print_exc()
-            i += 1  # Move to next line after error
+            muser_error_print(f"Error evaluating loop count on line {line_number}: {e}")
+            return
+        if not isinstance(evaluated_count, (int, float)):
+            muser_error_print(f"Error: Loop count must be a number on line {line_number}.")
+            return
+
+        integer_count = int(evaluated_count)
+        if integer_count <= 0:
+            if logging_enabled:
+                muser_log("loop_skip", "Someone used loop on line {line} with integer {count}, not looping =)", line=line_number, count=integer_count)
+            return
+        execute_statements = self.execute_statements
+        if logging_enabled:
+            muser_log("loop", "Someone used loop on line {line} with integer {count}, looping {count} times.", line=line_number, count=integer_count)
+            for iteration in range(integer_count):
+                muser_log("loop_iteration", "--- Loop Iteration {iteration} (starting at line {line}) ---", iteration=iteration + 1, line=line_number + 1)
+                execute_statements(body_statements)
+        else:
+            for _ in range(integer_count):
+                execute_statements(body_statements)
+
 
-    muser_print("Parser Finished.")
+def run_snippets(snippets, max_workers=None):
+    """
+    Runs each snippet on its own InmInterpreter across a thread pool.
+    Returns (output_text, variables) per snippet, in order.
+    """
+    def run_snippet(code):
+        output = io.StringIO()
+        snippet_interpreter = InmInterpreter(output)
+        snippet_interpreter.run(code)
+        return output.getvalue(), snippet_interpreter.variables
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_snippet, snippets))
+
+# --- Module-level interface ---
+# The functions below drive a default interpreter that uses the module's `variables`
+# and builtins and writes to stdout, so builtins registered (or added to `builtins`) after
+# import reach it. Each function flushes the output it produced before returning.
+_default_interpreter = InmInterpreter(variables=variables, shared_builtins=True)
+
+def evaluate_expression(expression_tokens):
+    return _default_interpreter.evaluate(expression_tokens)
+
+def interpreter(tokens, line_number=None):
+    """Interprets a single command token list."""
+    try:
+        _default_interpreter.interpreter(tokens, line_number)
+    finally:
+        _default_renderer.flush()
+
+def compile_program(code):
+    try:
+        return _default_interpreter.compile_program(code)
+    finally:
+        _default_renderer.flush()
+
+def execute_statements(statements):
+    try:
+        _default_interpreter.execute_statements(statements)
+    finally:
+        _default_renderer.flush()
+
+def parser(code):
+    """Compiles the code into statements (blocks parsed once) and executes them."""
+    _default_interpreter.run(code)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,98 @@
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
-from PIL import Image, ImageTk
 import cv2
 import os
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DURATION = 1.0 # Seconds each image is shown
+VIDEO_FPS = 1.0 # A consistent FPS for the video (adjust as needed)
+# Images are read and resized on a thread pool (cv2 releases the GIL for both) while the
+# writer encodes; at most PREFETCH_PER_WORKER images per worker wait ahead of the writer,
+# which bounds memory however long the slideshow is.
+PREFETCH_PER_WORKER = 2
+
+def load_frame(img_path, frame_size):
+    """Reads an image and resizes it to frame_size (width, height). Returns (image or None, error message)."""
+    try:
+        img = cv2.imread(img_path)
+        if img is None:
+            return None, f"Error reading image: {img_path}"
+        if (img.shape[1], img.shape[0]) != frame_size:
+            img = cv2.resize(img, frame_size)
+        return img, None
+    except Exception as e:
+        return None, f"Error processing image {img_path}: {e}"
+
+class ConversionError(Exception):
+    """A conversion that can't go ahead (no images, none of them readable, unwritable output)."""
+    pass
+
+def convert_images_to_video(image_paths, output_path, durations=None, fps=VIDEO_FPS, workers=None):
+    """
+    Writes the images to an MJPG .avi video (output_path with its extension replaced), each
+    shown for durations[path] seconds (default DEFAULT_DURATION). Every frame is resized to
+    the size of the first readable image; unreadable images are skipped. `workers` threads
+    (default: CPU count) prepare the next images while the current one is written. Returns
+    the path written.
+    """
+    if not image_paths:
+        raise ConversionError("No images selected for conversion.")
+    durations = durations or {}
+    workers = workers or os.cpu_count() or 1
+
+    first_image = None
+    for first_index, first_path in enumerate(image_paths):
+        first_image = cv2.imread(first_path)
+        if first_image is not None:
+            break
+        print(f"Error reading image: {first_path}")
+    if first_image is None:
+        raise ConversionError("None of the selected images could be read.")
+    frame_height, frame_width = first_image.shape[:2]
+    frame_size = (frame_width, frame_height)
+
+    fourcc = cv2.VideoWriter_fourcc(*'MJPG')  # Or another codec
+    output_path_avi = output_path.rsplit('.', 1)[0] + '.avi'
+    out = cv2.VideoWriter(output_path_avi, fourcc, fps, frame_size, isColor=True)
+
+    if not out.isOpened():
+        raise ConversionError(f"Error: Could not open output video file at {output_path_avi}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            remaining = iter(image_paths[first_index + 1:])
+            pending = deque() # Futures of the images being prepared, in video order
+            def prefetch():
+                while len(pending) < workers * PREFETCH_PER_WORKER:
+                    img_path = next(remaining, None)
+                    if img_path is None:
+                        return
+                    pending.append((img_path, executor.submit(load_frame, img_path, frame_size)))
+
+            def write_frames(img_path, img):
+                duration = durations.get(img_path, DEFAULT_DURATION)
+                # For a consistent video FPS, the number of frames to add is directly related to the duration
+                frames_to_add = int(fps * duration)
+                print(f"Writing image: {img_path} for {duration} seconds ({frames_to_add} frames)")
+                for _ in range(frames_to_add):
+                    out.write(img)
+
+            prefetch()
+            write_frames(first_path, first_image)
+            while pending:
+                img_path, future = pending.popleft()
+                img, error = future.result()
+                prefetch()
+                if img is None:
+                    print(error)
+                else:
+                    write_frames(img_path, img)
+    finally:
+        out.release()
+    return output_path_avi
 
 class ImageToVideoConverter:
     def __init__(self, master):
@@ -223,49 +311,11 @@ class ImageToVideoConverter:
 
     def convert_images_to_video(self):
         try:
-            if not self.image_paths:
-                self.master.after(0, self.conversion_complete, "No images selected for conversion.")
-                return
-
-            first_image_path = self.image_paths[0]
-            try:
-                first_image = Image.open(first_image_path)
-                frame_width, frame_height = first_image.size
-            except Exception as e:
-                self.master.after(0, self.conversion_complete, f"Error opening first image: {e}")
-                return
-
-            fourcc = cv2.VideoWriter_fourcc(*'MJPG')  # Or another codec
-            output_path_avi = self.output_path.rsplit('.', 1)[0] + '.avi'
-            consistent_fps = 1.0  # Set a consistent FPS for the video (adjust as needed)
-            out = cv2.VideoWriter(output_path_avi, fourcc, consistent_fps, (frame_width, frame_height), isColor=True)
-
-            if not out.isOpened():
-                self.master.after(0, self.conversion_complete, f"Error: Could not open output video file at {output_path_avi}")
-                return
-
-            for img_path in self.image_paths:
-                settings = self.image_settings[img_path]
-                duration = settings['duration']
-                # For a consistent video FPS, the number of frames to add is directly related to the duration
-                frames_to_add = int(consistent_fps * duration)
-
-                try:
-                    img = cv2.imread(img_path)
-                    if img is not None:
-                        print(f"Writing image: {img_path} for {duration} seconds ({frames_to_add} frames)")
-                        if img.shape[1] != frame_width or img.shape[0] != frame_height:
-                            img = cv2.resize(img, (frame_width, frame_height))
-                        for _ in range(frames_to_add):
-                            out.write(img)
-                    else:
-                        print(f"Error reading image: {img_path}")
-                except Exception as e:
-                    print(f"Error processing image {img_path}: {e}")
-
-            out.release()
+            durations = {path: settings['duration'] for path, settings in self.image_settings.items()}
+            convert_images_to_video(self.image_paths, self.output_path, durations)
             self.master.after(0, self.conversion_complete, "Conversion successful!")
-
+        except ConversionError as e:
+            self.master.after(0, self.conversion_complete, str(e))
         except Exception as e:
             self.master.after(0, self.conversion_complete, f"Conversion failed: {e}")
 
@@ -1,5 +1,9 @@
 import re
+import sys
 import math
+import operator
+from collections import deque
+from functools import lru_cache
 
 # --- 1. Lexer (Tokenization) ---
 
@@ -196,10 +200,12 @@ class BinaryLiteralNode(ASTNode):
     def __init__(self, token_value):
         # token_value can be '$$', '$$$', ';;$$$$$$$;$$$$$$$$', etc.
         self.raw_value = token_value
+        self.value = decode_binary_literal(token_value) # Decoded once, at parse time
 
 class RealNumberNode(ASTNode):
     def __init__(self, token):
         self.raw_value = token.value
+        self.value = decode_real_number(token.value) # Decoded once, at parse time
 
 class ArrayLiteralNode(ASTNode):
     def __init__(self, elements):
@@ -219,6 +225,8 @@ class BinaryOpNode(ASTNode):
         self.left = left_expr
         self.op = op_token.value
         self.right = right_expr
+        # Pick the arithmetic path now rather than on every evaluation
+        self.operation, self.operand_check = select_binary_operation(self.op, left_expr, right_expr)
 
 class InputNode(ASTNode): # For '<'
     def __init__(self, var_name_token):
@@ -276,6 +284,46 @@ class ExceptionLiteralNode(ASTNode): # For '(exception_message)'
     def __init__(self, message_token):
         self.message = message_token.value[1:-1] # Remove parentheses
 
+# --- Literal decoding ---
+
+BINARY_LITERAL_VALUES = {
+    '$$': False,
+    '$$$': True,
+    '$$$$': None,
+    '$$$$$': [], # "Empty, non-existent"; the interpreter hands out a new list each time
+    '$$$$$$': 0,
+    '$$$$$$$': 0, # Single binary 0
+    '$$$$$$$$': 1, # Single binary 1
+}
+
+# Unknown literals decode to this marker and raise MELRuntimeError only when evaluated,
+# so a bad literal in code that never runs doesn't stop the program from parsing.
+UNKNOWN_BINARY_LITERAL = object()
+
+def decode_binary_literal(raw_value):
+    """Converts a binary literal ('$$', ';;$$$$$$$$;$$$$$$$', ...) to its Python value, or UNKNOWN_BINARY_LITERAL."""
+    if raw_value in BINARY_LITERAL_VALUES:
+        return BINARY_LITERAL_VALUES[raw_value]
+    
+    # Handle multi-bit binary numbers: ;;$$$$$$$;$$$$$$$$
+    if raw_value.startswith(';;'):
+        # Split by ';' and map to '0' or '1'
+        bit_parts = raw_value[2:].split(';')
+        bits = ''.join(['0' if b == '$$$$$$$' else '1' for b in bit_parts if b]) # Filter empty strings from split
+        if not bits: # Handle cases like `;;`
+            return 0
+        return int(bits, 2)
+    
+    return UNKNOWN_BINARY_LITERAL
+
+def decode_real_number(raw_value):
+    """Converts a real literal to a float: each group of '#' is one digit (###:#:#### -> 3.14)."""
+    parts = raw_value.split(":")
+    # Convert # to digit length, then join for float
+    digits = [str(len(part)) for part in parts]
+    # First group is the integer part, the rest are fractional digits
+    return float(digits[0] + "." + "".join(digits[1:]))
+
 class Parser:
     """Builds an Abstract Syntax Tree (AST) from a stream of Tokens."""
     def __init__(self, tokens):
@@ -572,16 +620,21 @@ class Parser:
         body_statements = self._parse_block(
             end_tokens=['RETURN', 'FUNCTION_DEF', 'PROGRAM_END', 'IF', 'WHILE_LOOP', 'FOR_LOOP', 'TRY', 'CATCH'] 
         )
+        # The closing '^' belongs to the function: it is its return statement.
+        if self.current_token() and self.current_token().type == 'RETURN':
+            body_statements.append(self.parse_return())
         
         return FunctionDefNode(func_name_token, params, body_statements)
 
     def parse_return(self):
         """Parses a return statement: ^ [EXPRESSION]."""
-        self.eat('RETURN')
+        return_token = self.eat('RETURN')
         expr = None
         # Check if there's an expression after '^'
-        # A return expression can be followed by comments or end of program
-        if self.current_token() and self.current_token().type not in ['PROGRAM_END', 'COMMENT_SINGLE', 'COMMENT_PURE']:
+        # A return expression can be followed by comments or end of program, and must
+        # start on the same line (otherwise a bare '^' would swallow the next statement)
+        if self.current_token() and self.current_token().type not in ['PROGRAM_END', 'COMMENT_SINGLE', 'COMMENT_PURE'] \
+           and self.current_token().line == return_token.line:
             try:
                 expr = self.parse_expression()
             except Exception:
@@ -701,12 +754,116 @@ class Parser:
         """Starts the parsing process."""
         return self.parse_program()
 
+def parse_mel(code_string):
+    """Lexes and parses MEL source code into a ProgramNode."""
+    return Parser(Lexer(code_string).get_tokens()).parse()
+
+# Embedded code run via `->> :` is usually the same few snippets over and over
+# (e.g. inside a loop), so keep the most recently used ASTs around.
+EMBEDDED_AST_CACHE_SIZE = 128
+
+@lru_cache(maxsize=EMBEDDED_AST_CACHE_SIZE)
+def parse_embedded_mel(code_string):
+    """Cached parse_mel for `->> :`. ASTs are never mutated by the interpreter, so sharing is safe."""
+    return parse_mel(code_string)
+
 # --- 3. Interpreter (Execution) ---
 
+# How many recently printed characters `>>` / `<<` can reach back to. Older characters
+# are dropped, so `>> N` / `<< N` with N above this limit is an error even when more
+# characters than that have been printed (earlier versions kept the whole output).
+OUTPUT_HISTORY_SIZE = 4096
+# Pending output is written to the sink once it grows past this many chunks,
+# and otherwise at every top-level statement and at the end of the program.
+OUTPUT_FLUSH_THRESHOLD = 1024
+
 class MELRuntimeError(Exception):
     """Custom exception for MEL runtime errors."""
     pass
 
+# --- Arithmetic ---
+# Each operator maps to a plain function of (left, right). Factorial and square root are
+# unary-like: their right operand is ignored.
+
+def _binary_div(l, r):
+    if r == 0: raise MELRuntimeError("( $$$$$$/$$$$$$ ) Binary division by zero")
+    return l // r # Integer division for binary
+
+def _binary_factorial(l, r):
+    if l < 0: raise MELRuntimeError("( |#...#! ) Binary factorial of negative number")
+    return math.factorial(l)
+
+def _binary_sqrt(l, r):
+    if l < 0: raise MELRuntimeError("( #\\|#... ) Binary square root of negative number")
+    return math.isqrt(l) # Integer result for binary sqrt
+
+def _binary_mod(l, r):
+    if r == 0: raise MELRuntimeError("Binary modulo by zero")
+    return l % r
+
+def _real_div(l, r):
+    if r == 0: raise MELRuntimeError("( $$$$$$/$$$$$$ ) Real division by zero")
+    return l / r # Float division for real
+
+def _real_factorial(l, r):
+    if l < 0: raise MELRuntimeError("( |#...#! ) Real factorial of negative number")
+    # Factorial for floats is complex (Gamma function). For simplicity, only integer part.
+    try:
+        return float(math.factorial(int(l)))
+    except OverflowError:
+        return math.inf
+
+def _real_sqrt(l, r):
+    if l < 0: raise MELRuntimeError("( #\\|#... ) Real square root of negative number")
+    return math.sqrt(l)
+
+def _real_mod(l, r):
+    if r == 0: raise MELRuntimeError("Real modulo by zero")
+    return l % r
+
+BINARY_OPERATIONS = {
+    '$+': operator.add, '$-': operator.sub, '$*': operator.mul, '$/': _binary_div,
+    '$!': _binary_factorial, '$\\': _binary_sqrt, '$%': _binary_mod, '$^': operator.pow,
+    # Binary Comparison
+    '$<': operator.lt, '$=': operator.eq, '$>': operator.gt,
+    '$<=': operator.le, '$>=': operator.ge, '$!=': operator.ne,
+}
+
+REAL_OPERATIONS = {
+    '#+': operator.add, '#-': operator.sub, '#*': operator.mul, '#/': _real_div,
+    '#!': _real_factorial, '#\\': _real_sqrt, '#%': _real_mod, '#^': operator.pow,
+    # Real Comparison
+    '#<': operator.lt, '#=': operator.eq, '#>': operator.gt,
+    '#<=': operator.le, '#>=': operator.ge, '#!=': operator.ne,
+}
+
+def _check_binary_operands(op, l, r):
+    if not isinstance(l, int) or not isinstance(r, int):
+        raise MELRuntimeError(f"Binary operator '{op}' expects integers, got {type(l)} and {type(r)}")
+
+def _check_real_operands(op, l, r):
+    if not isinstance(l, (int, float)) or not isinstance(r, (int, float)):
+        raise MELRuntimeError(f"Binary operator '{op}' expects real numbers, got {type(l)} and {type(r)}")
+
+def select_binary_operation(op, left_expr, right_expr):
+    """
+    Chooses how a BinaryOpNode is evaluated, once, at parse time.
+    Returns (operation, operand_check). The check is dropped when both operands are
+    literals whose type already satisfies the operator.
+    """
+    if op.startswith('$'):
+        operation = BINARY_OPERATIONS.get(op)
+        check = _check_binary_operands
+        literal_types = (int,)
+    else:
+        operation = REAL_OPERATIONS.get(op)
+        check = _check_real_operands
+        literal_types = (int, float)
+    if all(isinstance(expr, (BinaryLiteralNode, RealNumberNode)) and isinstance(expr.value, literal_types)
+           for expr in (left_expr, right_expr)):
+        check = None
+    return operation, check
+
 class Environment:
     """Manages variable scopes."""
     def __init__(self, parent=None):
@@ -737,11 +894,23 @@ class Environment:
 
 class Interpreter:
     """Executes the MEL Abstract Syntax Tree."""
-    def __init__(self):
+    def __init__(self, output=None):
+        # Output sink: any object with write() and flush(), stdout by default
+        self.output = output if output is not None else sys.stdout
+        self._pending_output = [] # Text written by the program but not yet handed to the sink
+        self.reset()
+        self._sub_interpreter = None # Reused by `->> :`, created on first use
+
+    def reset(self):
+        """Clears all program state so the interpreter can run a new program."""
         self.global_env = Environment()
         self.current_env = self.global_env
-        self.output_buffer = [] # Stores recently printed characters for >> and <<
+        self.output_buffer = deque(maxlen=OUTPUT_HISTORY_SIZE) # Recently printed characters for >> and <<
         self.functions = {} # Stores defined functions: {name: FunctionDefNode}
+        # Completion record for '^': set by visit_ReturnNode, consumed by the enclosing call.
+        # Using a flag instead of an exception keeps the normal return path cheap.
+        self.return_pending = False
+        self.return_value = None
 
     def _visit(self, node):
         """Dispatches to the appropriate visit method based on node type."""
@@ -754,11 +923,44 @@ class Interpreter:
 
     def interpret(self, ast):
         """Starts the interpretation process from the root AST node."""
-        self._visit(ast)
+        try:
+            self._visit(ast)
+        finally:
+            self.flush_output() # Program boundary, also reached when the program fails
+
+    def _emit(self, text):
+        """Queues program output; it reaches the sink at the next flush point."""
+        self._pending_output.append(text)
+        if len(self._pending_output) >= OUTPUT_FLUSH_THRESHOLD:
+            self._write_pending_output()
+
+    def _write_pending_output(self):
+        if self._pending_output:
+            self.output.write("".join(self._pending_output))
+            self._pending_output.clear()
+
+    def flush_output(self):
+        """Writes all pending output to the sink and flushes it."""
+        self._write_pending_output()
+        self.output.flush()
+
+    def _execute_block(self, statements):
+        """
+        Executes statements in order, stopping early once a '^' has been executed.
+        Returns True if a return is pending, so enclosing blocks can unwind too.
+        """
+        for statement in statements:
+            self._visit(statement)
+            if self.return_pending:
+                return True
+        return False
 
     def visit_ProgramNode(self, node):
         for statement in node.statements:
             self._visit(statement)
+            self._write_pending_output() # Statement boundary
+            if self.return_pending: # A top-level '^' simply ends the program.
+                break
 
     def visit_AssignmentNode(self, node):
         value = self._visit(node.value_expr)
@@ -768,32 +970,15 @@ class Interpreter:
         return node.value
 
     def visit_BinaryLiteralNode(self, node):
-        raw_value = node.raw_value
-        if raw_value == '$$': return False
-        if raw_value == '$$$': return True
-        if raw_value == '$$$$': return None
-        if raw_value == '$$$$$': return [] # Represents "empty, non-existent" as an empty list/array
-        if raw_value == '$$$$$$': return 0
-        if raw_value == '$$$$$$$': return 0 # Single binary 0
-        if raw_value == '$$$$$$$$': return 1 # Single binary 1
-        
-        # Handle multi-bit binary numbers: ;;$$$$$$$;$$$$$$$$
-        if raw_value.startswith(';;'):
-            # Reconstruct the bit string from raw_value (e.g., ';;$$$$$$$$;$$$$$$$')
-            # Split by ';' and map to '0' or '1'
-            bit_parts = raw_value[2:].split(';')
-            bits = ''.join(['0' if b == '$$$$$$$' else '1' for b in bit_parts if b]) # Filter empty strings from split
-            if not bits: # Handle cases like `;;`
-                return 0
-            return int(bits, 2)
-        
-        raise MELRuntimeError(f"Unknown binary literal: {raw_value}")
+        value = node.value
+        if type(value) is list:
+            return [] # "Empty, non-existent": a new empty array every time
+        if value is UNKNOWN_BINARY_LITERAL:
+            raise MELRuntimeError(f"Unknown binary literal: {node.raw_value}")
+        return value
 
     def visit_RealNumberNode(self, node):
-        parts = node.raw_value.split(":")
-        # Convert # to digit length, then join for float
-        digits = [str(len(part)) for part in parts]
-        return float(".".join([digits[0]] + digits[1:]))
+        return node.value
 
     def visit_ArrayLiteralNode(self, node):
         return [self._visit(elem) for elem in node.elements]
@@ -812,79 +997,14 @@ class Interpreter:
     def visit_BinaryOpNode(self, node):
         left_val = self._visit(node.left)
         right_val = self._visit(node.right)
-        op = node.op
-
-        # Helper for type checking
-        def check_types(l, r, expected_type_str):
-            if not isinstance(l, (int, float)) or not isinstance(r, (int, float)):
-                raise MELRuntimeError(f"Binary operator '{op}' expects {expected_type_str} numbers, got {type(l)} and {type(r)}")
-
-        if op.startswith('$'): # Binary operators
-            check_types(left_val, right_val, "binary")
-            if not isinstance(left_val, int) or not isinstance(right_val, int):
-                raise MELRuntimeError(f"Binary operator '{op}' expects integers, got {type(left_val)} and {type(right_val)}")
-
-            if op == '$+': return left_val + right_val
-            if op == '$-': return left_val - right_val
-            if op == '$*': return left_val * right_val
-            if op == '$/':
-                if right_val == 0: raise MELRuntimeError("( $$$$$$/$$$$$$ ) Binary division by zero")
-                return left_val // right_val # Integer division for binary
-            if op == '$!': # Factorial (right_val is ignored, it's unary-like)
-                if left_val < 0: raise MELRuntimeError("( |#...#! ) Binary factorial of negative number")
-                res = 1
-                for i in range(1, left_val + 1): res *= i
-                return res
-            if op == '$\\': # Square root (right_val is ignored, it's unary-like)
-                if left_val < 0: raise MELRuntimeError("( #\\|#... ) Binary square root of negative number")
-                return int(left_val**0.5) # Integer result for binary sqrt
-            if op == '$%':
-                if right_val == 0: raise MELRuntimeError("Binary modulo by zero")
-                return left_val % right_val
-            if op == '$^': return left_val ** right_val
-            
-            # Binary Comparison
-            if op == '$<': return left_val < right_val
-            if op == '$=': return left_val == right_val
-            if op == '$>': return left_val > right_val
-            if op == '$<=': return left_val <= right_val
-            if op == '$>=': return left_val >= right_val
-            if op == '$!=': return left_val != right_val
-
-        elif op.startswith('#'): # Real operators
-            check_types(left_val, right_val, "real")
-
-            if op == '#+': return left_val + right_val
-            if op == '#-': return left_val - right_val
-            if op == '#*': return left_val * right_val
-            if op == '#/':
-                if right_val == 0: raise MELRuntimeError("( $$$$$$/$$$$$$ ) Real division by zero")
-                return left_val / right_val # Float division for real
-            if op == '#!': # Factorial (right_val is ignored, it's unary-like)
-                if left_val < 0: raise MELRuntimeError("( |#...#! ) Real factorial of negative number")
-                # Factorial for floats is complex (Gamma function). For simplicity, only integer part.
-                res = 1.0
-                for i in range(1, int(left_val) + 1): res *= i
-                return res
-            if op == '#\\': # Square root (right_val is ignored, it's unary-like)
-                if left_val < 0: raise MELRuntimeError("( #\\|#... ) Real square root of negative number")
-                return left_val**0.5
-            if op == '#%':
-                if right_val == 0: raise MELRuntimeError("Real modulo by zero")
-                return left_val % right_val
-            if op == '#^': return left_val ** right_val
-
-            # Real Comparison
-            if op == '#<': return left_val < right_val
-            if op == '#=': return left_val == right_val
-            if op == '#>': return left_val > right_val
-            if op == '#<=': return left_val <= right_val
-            if op == '#>=': return left_val >= right_val
-            if op == '#!=': return left_val != right_val
-
-        raise MELRuntimeError(f"Unknown binary operator: {op}")
+        if node.operation is None:
+            raise MELRuntimeError(f"Unknown binary operator: {node.op}")
+        if node.operand_check is not None:
+            node.operand_check(node.op, left_val, right_val)
+        return node.operation(left_val, right_val)
 
     def visit_InputNode(self, node):
+        self.flush_output() # Make sure the user sees everything printed so far
         input_value = input(f"Enter value for '{node.var_name}': ")
         self.current_env.assign(node.var_name, input_value) # Store as string, conversion handled by eval_expr if needed
 
@@ -903,7 +1023,7 @@ class Interpreter:
             char_to_print = str(value)[0] if len(str(value)) > 0 else ''
 
         self.output_buffer.append(char_to_print)
-        print(char_to_print, end="")
+        self._emit(char_to_print)
 
     def visit_MultiCharOutputNode(self, node):
         count = self._visit(node.count)
@@ -911,16 +1031,17 @@ class Interpreter:
             raise MELRuntimeError(f"Multi-character output count must be a non-negative integer, got {count}")
         
         if count > len(self.output_buffer):
+            if len(self.output_buffer) == OUTPUT_HISTORY_SIZE:
+                raise MELRuntimeError(f"Cannot retrieve {count} characters, >> and << only reach back {OUTPUT_HISTORY_SIZE} printed characters.")
             raise MELRuntimeError(f"Cannot retrieve {count} characters, only {len(self.output_buffer)} available in buffer.")
 
-        chars_to_print = self.output_buffer[-count:]
+        # Take the printed characters off the end of the buffer (they come out newest first)
+        pop = self.output_buffer.pop
+        chars_to_print = [pop() for _ in range(count)]
         if node.type == 'OUTPUT_REVERSED': # >> N
-            print("".join(reversed(chars_to_print)), end="")
+            self._emit("".join(chars_to_print))
         else: # << N
-            print("".join(chars_to_print), end="")
-        
-        # Clear printed characters from buffer
-        self.output_buffer = self.output_buffer[:-count]
+            self._emit("".join(reversed(chars_to_print)))
 
     def visit_FunctionCallNode(self, node):
         func_name = node.func_name
@@ -956,7 +1077,7 @@ class Interpreter:
             if len(args_values) != 1: raise MELRuntimeError("list requires one argument")
             val = args_values[0]
             if isinstance(val, (str, list)):
-                print(val, end="") # Prints the Python representation of the list/string
+                self._emit(str(val)) # Prints the Python representation of the list/string
             else:
                 raise MELRuntimeError(f"list expects string or array, got {type(val)}")
             return None
@@ -974,15 +1095,16 @@ class Interpreter:
             
             embedded_code = args_values[0]
             try:
-                # Create a new lexer/parser/interpreter for the embedded code
-                # This will run in its own isolated environment (global scope)
-                sub_lexer = Lexer(embedded_code)
-                sub_tokens = sub_lexer.get_tokens()
-                sub_parser = Parser(sub_tokens)
-                sub_ast = sub_parser.parse()
+                # Parsed ASTs are cached by source text, and the sub-interpreter is reused.
+                # It is reset first, so the code still runs in its own isolated environment (global scope)
+                sub_ast = parse_embedded_mel(embedded_code)
                 
-                sub_interpreter = Interpreter()
-                sub_interpreter.interpret(sub_ast)
+                if self._sub_interpreter is None:
+                    self._sub_interpreter = Interpreter(self.output)
+                else:
+                    self._sub_interpreter.reset()
+                self._write_pending_output() # Keep our output ahead of the embedded program's
+                self._sub_interpreter.interpret(sub_ast)
                 return None
             except Exception as e:
                 raise MELRuntimeError(f"Error in embedded MEL code: {e}")
@@ -1003,18 +1125,18 @@ class Interpreter:
         for i, param_node in enumerate(func_def_node.params):
             self.current_env.define(param_node.name, args_values[i])
             
-        return_value = None
         try:
             # Execute function body statements
-            for statement in func_def_node.body:
-                self._visit(statement)
-        except ReturnValue as rv: # Catch custom return exception
-            return_value = rv.value
+            self._execute_block(func_def_node.body)
         except Exception as e: # Catch any other unexpected Python errors during function body execution
             raise MELRuntimeError(f"Python error during function '{func_name}' execution: {e}") from e
         finally:
             self.current_env = previous_env # Restore previous scope
         
+        # Consume the completion record left by '^' (None if the body just ran out)
+        return_value = self.return_value
+        self.return_pending = False
+        self.return_value = None
         return return_value
 
     def visit_FunctionDefNode(self, node):
@@ -1023,29 +1145,28 @@ class Interpreter:
 
     def visit_ReturnNode(self, node):
         value = self._visit(node.expression) if node.expression else None
-        raise ReturnValue(value) # Use a custom exception for non-local exits
+        # Signal the return; _execute_block unwinds the enclosing blocks
+        self.return_value = value
+        self.return_pending = True
 
     def visit_IfStatementNode(self, node):
         condition_result = self._visit(node.condition)
         if condition_result:
-            for stmt in node.if_body:
-                self._visit(stmt)
+            self._execute_block(node.if_body)
         else:
             found_else_if = False
             for cond, body in node.else_if_branches:
                 if self._visit(cond):
-                    for stmt in body:
-                        self._visit(stmt)
+                    self._execute_block(body)
                     found_else_if = True
                     break
             if not found_else_if and node.else_body:
-                for stmt in node.else_body:
-                    self._visit(stmt)
+                self._execute_block(node.else_body)
 
     def visit_WhileLoopNode(self, node):
         while self._visit(node.condition):
-            for stmt in node.body:
-                self._visit(stmt)
+            if self._execute_block(node.body):
+                break
 
     def visit_ForLoopNode(self, node):
         iterable = self._visit(node.range_expr)
@@ -1057,33 +1178,25 @@ class Interpreter:
         
         for item in iterable:
             self.current_env.define(node.iterator_var.name, item)
-            for stmt in node.body:
-                self._visit(stmt)
+            if self._execute_block(node.body):
+                break
         
         self.current_env = previous_env # Restore scope
 
     def visit_TryCatchNode(self, node):
         try:
-            for stmt in node.try_body:
-                self._visit(stmt)
+            self._execute_block(node.try_body)
         except MELRuntimeError as e:
             # If `exception_var` was specified in the AST, we'd assign `e.message` to it.
             # For now, just execute the catch body.
-            for stmt in node.catch_body:
-                self._visit(stmt)
+            self._execute_block(node.catch_body)
         except Exception as e: # Catch any unexpected Python errors during try block execution
-            for stmt in node.catch_body:
-                self._visit(stmt)
+            self._execute_block(node.catch_body)
 
     def visit_ExceptionLiteralNode(self, node):
         # When an exception literal is evaluated, it means it's being thrown.
         raise MELRuntimeError(node.message)
 
-class ReturnValue(Exception):
-    """Custom exception for handling function returns (non-local exit)."""
-    def __init__(self, value):
-        self.value = value
-
 # --- Main Runner Function ---
 
 def run_mel_code(code_string):
@@ -1106,9 +1219,6 @@ def run_mel_code(code_string):
 
     except MELRuntimeError as e:
         print(f"\nMEL Runtime Error: {e}")
-    except ReturnValue as e: # Catch ReturnValue specifically to suppress traceback
-        # print(f"\nFunction returned: {e.value}") # Optional: for debugging returns
-        pass # Suppress traceback for normal function returns
     except Exception as e:
         print(f"\nInternal Interpreter Error: {e}")
         import traceback
@@ -1179,6 +1289,7 @@ reversed_fruits = ->> reverse fruits
 """
 
 # Example 4: Output Buffer (>> and <<) (Parser fixed for expressions)
+# The buffer only holds the last OUTPUT_HISTORY_SIZE (4096) printed characters, so N can't go past that.
 sample_code_4 = """
 ::: Program start
 > "A"
@@ -1,14 +1,23 @@
+import atexit
 import re
 import shlex
-from colorama import Fore, Style, init
-
-# Initialize colorama for Windows compatibility
-init(autoreset=True)
+from functools import lru_cache
+from colorama import Fore
+from console_renderer import ConsoleRenderer
 
 variables: dict = {}
+trace_tokens = False # Print each line's tokens as it runs (debugging aid)
+PROGRAM_CACHE_SIZE = 64 # Compiled programs kept by compile_program
+LINE_CACHE_SIZE = 4096 # Compiled lines, shared by all programs (repeated lines tokenize once)
+
+# Buffered output; colors are only emitted on a terminal (see console_renderer)
+renderer = ConsoleRenderer()
+atexit.register(renderer.flush)
 
 def colored_output(text, color=Fore.WHITE):
-    print(color + text + Style.RESET_ALL)
+    if not renderer.has_style(color):
+        renderer.add_style(color, text_style=color) # The color code is the style name
+    renderer.write_line(color, text)
 
 def system_output(arguments):
     output = []
@@ -22,96 +31,110 @@ def system_output(arguments):
 
 def system_input(arguments):
     prompt = colored_output(" ".join(arguments) + " ", Fore.YELLOW) if arguments else colored_output("", Fore.YELLOW)
+    renderer.flush() # Everything printed so far must appear before input() blocks
     return input(prompt)
 
-def interpreter(tokens):
-    if not tokens:
-        return None
+# --- Compiler ---
+# Every command is resolved once, from its tokens, into a handler: a function of no
+# arguments that does the work. Only variable lookups and input happen at run time.
 
-    command = tokens[0].lower()
+def _strip_quotes(text):
+    if text.startswith('"') and text.endswith('"') or text.startswith("'") and text.endswith("'"):
+        return text[1:-1]
+    return text
 
-    if command.startswith("system."):
-        parts = command.split('.', 1)
-        if len(parts) == 2:
-            sub_command = parts[1]
-            if sub_command == "output":
-                return system_output(tokens[1:])
-            elif sub_command == "input":
-                return system_input(tokens[1:])
-            else:
-                colored_output(f"Unknown system command: {sub_command}", Fore.RED)
-                return None
-        else:
-            colored_output(f"Invalid system command format: {command}", Fore.RED)
-            return None
-    elif command == "let":
-        if len(tokens) == 5 and tokens[1] == "=" and tokens[2].lower() == "system.input" and (tokens[4].startswith('"') and tokens[4].endswith('"') or tokens[4].startswith("'") and tokens[4].endswith("'")):
-            variable_name = tokens[0]
+def _error_handler(message):
+    return lambda: colored_output(message, Fore.RED)
+
+def _compile_output(arguments, color):
+    """arguments: (name, literal) pairs; a variable called `name` wins, otherwise the literal is printed."""
+    def run_output():
+        colored_output(" ".join([variables[arg] if arg in variables else literal for arg, literal in arguments]), color)
+    return run_output
+
+def _compile_system(command, tokens):
+    parts = command.split('.', 1)
+    if len(parts) != 2:
+        return _error_handler(f"Invalid system command format: {command}")
+    sub_command = parts[1]
+    if sub_command == "output":
+        return _compile_output([(arg, arg) for arg in tokens[1:]], Fore.GREEN)
+    if sub_command == "input":
+        arguments = tokens[1:]
+        return lambda: system_input(arguments)
+    return _error_handler(f"Unknown system command: {sub_command}")
+
+def _compile_let(tokens):
+    variable_name = tokens[0]
+    if len(tokens) == 5 and tokens[1] == "=" and tokens[2].lower() == "system.input":
+        if tokens[4].startswith('"') and tokens[4].endswith('"') or tokens[4].startswith("'") and tokens[4].endswith("'"):
             prompt = tokens[4][1:-1]
-            user_input = system_input([prompt])
-            variables[variable_name] = user_input
-            return None
-        elif len(tokens) == 5 and tokens[1] == "=" and tokens[2].lower() == "system.input":
-            # Handle the case where the prompt is the rest of the tokens after system.input
-            prompt_parts = tokens[3:]
-            prompt = " ".join(prompt_parts).strip()
-            if prompt.startswith('"') and prompt.endswith('"'):
-                variable_name = tokens[0]
-                user_input = system_input([prompt[1:-1]])
-                variables[variable_name] = user_input
-                return None
-            elif prompt.startswith("'") and prompt.endswith("'"):
-                variable_name = tokens[0]
-                user_input = system_input([prompt[1:-1]])
-                variables[variable_name] = user_input
-                return None
-            else:
-                variable_name = tokens[0]
-                user_input = system_input([prompt]) # Try without assuming quotes
-                variables[variable_name] = user_input
-                return None
-        elif len(tokens) >= 3 and tokens[1] == "=":
-            variable_name = tokens[0]
-            variable_value_parts = tokens[2:]
-            variable_value = " ".join(variable_value_parts).strip()
-            if variable_value.startswith('"') and variable_value.endswith('"'):
-                variables[variable_name] = variable_value[1:-1]
-            elif variable_value.startswith("'") and variable_value.endswith("'"):
-                variables[variable_name] = variable_value[1:-1]
-            else:
-                variables[variable_name] = variable_value
-            return None
         else:
-            colored_output("Syntax error: Invalid variable assignment. Usage: let <variable> = <value> or let <variable> = system.input(\"prompt\")", Fore.RED)
-            return None
-    elif command == "print":
-        output = []
-        for arg in tokens[1:]:
-            if arg in variables:
-                output.append(variables[arg])
-            elif arg.startswith('"') and arg.endswith('"'):
-                output.append(arg[1:-1])
-            elif arg.startswith("'") and arg.endswith("'"):
-                output.append(arg[1:-1])
-            else:
-                output.append(arg)
-        colored_output(" ".join(output), Fore.BLUE)
-        return None
-    else:
-        colored_output(f"Unknown command: {command}", Fore.RED)
-        return None
+            # The prompt is the rest of the tokens after system.input
+            prompt = _strip_quotes(" ".join(tokens[3:]).strip())
 
-def parser(code):
-    lines = re.split(r"\n", code)
-    for line in lines:
+        def run_let_input():
+            variables[variable_name] = system_input([prompt])
+        return run_let_input
+    if len(tokens) >= 3 and tokens[1] == "=":
+        variable_value = _strip_quotes(" ".join(tokens[2:]).strip())
+
+        def run_let():
+            variables[variable_name] = variable_value
+        return run_let
+    return _error_handler("Syntax error: Invalid variable assignment. Usage: let <variable> = <value> or let <variable> = system.input(\"prompt\")")
+
+def compile_tokens(tokens):
+    """Resolves one command's tokens into its handler."""
+    command = tokens[0].lower()
+    if command.startswith("system."):
+        return _compile_system(command, tokens)
+    if command == "let":
+        return _compile_let(tokens)
+    if command == "print":
+        return _compile_output([(arg, _strip_quotes(arg)) for arg in tokens[1:]], Fore.BLUE)
+    return _error_handler(f"Unknown command: {command}")
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def _compile_line(line):
+    """Returns (tokens, handler) for a line. A tokenization error is raised when the line runs."""
+    try:
+        tokens = shlex.split(line)
+    except ValueError as e:
+        error = e
+
+        def run_tokenization_error():
+            raise error
+        return None, run_tokenization_error
+    if not tokens:
+        return tokens, lambda: None
+    return tokens, compile_tokens(tokens)
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def compile_program(code):
+    """Compiles code into a tuple of (line, tokens, handler) statements. Results are cached per code string."""
+    statements = []
+    for line in re.split(r"\n", code):
         if not line.strip():
             continue
         if line.strip().startswith("#"):
             continue
+        tokens, handler = _compile_line(line)
+        statements.append((line.strip(), tokens, handler))
+    return tuple(statements)
 
-        tokens = shlex.split(line)
-        print(f"{Fore.YELLOW}Tokens for line '{line.strip()}': {tokens}{Style.RESET_ALL}") # Debugging: Print the tokens
-        interpreter(tokens)
+def interpreter(tokens):
+    if not tokens:
+        return None
+    compile_tokens(tokens)()
+    return None
+
+def parser(code):
+    for line, tokens, handler in compile_program(code):
+        if trace_tokens and tokens is not None:
+            colored_output(f"Tokens for line '{line}': {tokens}", Fore.YELLOW)
+        handler()
+    renderer.flush()
 
 if __name__ == "__main__":
     codee = """
@@ -121,4 +144,4 @@ system.output "Your name is:" username
 print "The username is:" username
 """
     parser(codee)
-    print(Fore.CYAN + f"Variables: {variables}" + Style.RESET_ALL)
\ No newline at end of file
+    colored_output(f"Variables: {variables}", Fore.CYAN)
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+from colorama import Style
+
+try:
+    from colorama import just_fix_windows_console
+except ImportError: # colorama < 0.4.6
+    from colorama import init as just_fix_windows_console
+
+# --- Console Renderer ---
+# Shared by the INM and VSM interpreters. Every style's prefix/suffix is built once,
+# in a colored and a plain variant, and lines are collected in a list that is
+# written with a single write() call. Color is only used when the stream is a
+# terminal, so piped or captured output (files, StringIO) carries no ANSI codes.
+# colorama is only asked to enable ANSI support on Windows consoles; it no longer
+# wraps stdout, which made every print go through its escape-code parser.
+
+just_fix_windows_console()
+
+FLUSH_LINES = 256 # Buffered lines before a write
+FLUSH_INTERVAL = 0.05 # Seconds; a write also happens when the last one is older than this
+
+def stream_supports_color(stream):
+    """True when the stream is a terminal and NO_COLOR isn't set."""
+    if os.environ.get("NO_COLOR"):
+        return False
+    isatty = getattr(stream, "isatty", None)
+    try:
+        return bool(isatty and isatty())
+    except ValueError: # Closed stream
+        return False
+
+class ConsoleRenderer:
+    """
+    Buffered, styled line writer.
+    stream: where lines go; None means whatever sys.stdout is at write time.
+    color: True/False forces ANSI on or off; None decides per stream (see stream_supports_color).
+    Call flush() before anything else writes to the same stream (input prompts, tracebacks).
+    """
+    def __init__(self, stream=None, color=None, flush_lines=FLUSH_LINES, flush_interval=FLUSH_INTERVAL):
+        self.stream = stream
+        self.color = color
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self._styles = {} # name -> ((colored prefix, colored suffix), (plain prefix, plain suffix))
+        self._buffer = []
+        self._last_flush = time.perf_counter()
+        self._current_stream = None
+        self._use_color = False
+
+    def add_style(self, name, label="", label_style="", text_style=""):
+        """Defines a line style: an optional label (e.g. '[ERROR]: ') followed by the text."""
+        if label:
+            colored_prefix = label_style + label + Style.RESET_ALL + text_style
+        else:
+            colored_prefix = text_style
+        self._styles[name] = ((colored_prefix, Style.RESET_ALL + "\n"), (label, "\n"))
+
+    def has_style(self, name):
+        return name in self._styles
+
+    def _target(self):
+        stream = self.stream if self.stream is not None else sys.stdout
+        if stream is not self._current_stream:
+            # Stream changed (or first write): flush to the old one and re-check color support
+            if self._buffer:
+                self.flush()
+            self._current_stream = stream
+            self._use_color = stream_supports_color(stream) if self.color is None else self.color
+        return stream
+
+    def write_line(self, style, text):
+        """Buffers one line in the given style."""
+        self._target()
+        prefix, suffix = self._styles[style][0 if self._use_color else 1]
+        self._buffer.append(prefix + text + suffix)
+        if len(self._buffer) >= self.flush_lines or time.perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_plain(self, text):
+        """Buffers an unstyled line."""
+        self._target()
+        self._buffer.append(text + "\n")
+        if len(self._buffer) >= self.flush_lines:
+            self.flush()
+
+    def flush(self):
+        """Writes out the buffered lines."""
+        buffer = self._buffer
+        self._last_flush = time.perf_counter()
+        if not buffer:
+            return
+        self._buffer = []
+        stream = self._current_stream if self._current_stream is not None else sys.stdout
+        stream.write("".join(buffer))
+        stream.flush()
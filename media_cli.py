@@ -0,0 +1,208 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from File2audio import convert_file_to_audio, iter_decoded_audio
+from File2video import PROFILES, encode_file_to_video, iter_decoded_video
+from Images2video import DEFAULT_DURATION, VIDEO_FPS, convert_images_to_video
+
+# --- Headless media converter ---
+# Drives the File2video, File2audio and Images2video converters without any Tk window:
+# encodes files to videos or WAV files, builds slideshows from image folders and gets
+# the data back out again. Batches are spread over a process pool (--jobs), and every
+# file's throughput is reported on stderr.
+
+AUDIO_EXTENSIONS = (".wav",)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".webp")
+
+def _measure(input_paths, output_path, convert):
+    """Runs convert() and returns a result dict: input, output, status, error, bytes, elapsed and MB/s."""
+    status, error = "ok", None
+    start = time.perf_counter()
+    try:
+        output_path = convert() or output_path
+    except Exception as e:
+        status, error = "error", str(e)
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(path) for path in input_paths if os.path.isfile(path))
+    return {
+        "input": input_paths[0] if len(input_paths) == 1 else f"{len(input_paths)} images",
+        "output": output_path,
+        "status": status,
+        "error": error,
+        "bytes": size,
+        "elapsed": round(elapsed, 6),
+        "mb_per_second": round(size / 1e6 / elapsed, 3) if elapsed else None,
+    }
+
+def encode_video_job(job):
+    """Process pool entry point: job is (input_path, output_path, profile name)."""
+    input_path, output_path, profile_name = job
+    return _measure([input_path], output_path, lambda: encode_file_to_video(input_path, output_path, PROFILES[profile_name]))
+
+def encode_audio_job(job):
+    """Process pool entry point: job is (input_path, output_path)."""
+    input_path, output_path = job
+    return _measure([input_path], output_path, lambda: convert_file_to_audio(input_path, output_path))
+
+def images_job(job):
+    """Process pool entry point: job is (image_paths, output_path, seconds per image, fps, image threads)."""
+    image_paths, output_path, duration, fps, workers = job
+    durations = dict.fromkeys(image_paths, duration)
+    return _measure(image_paths, output_path, lambda: convert_images_to_video(image_paths, output_path, durations, fps, workers))
+
+def run_jobs(function, job_list, jobs=None):
+    """Runs function over job_list across a process pool, yielding results in order; jobs=1 runs in-process."""
+    if jobs == 1 or len(job_list) <= 1:
+        yield from map(function, job_list)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(function, job_list)
+
+def threads_per_job(job_count, jobs=None):
+    """
+    Image threads for each job, so that run_jobs' processes together use about one thread
+    per CPU. None (a single job, or jobs=1) leaves it to Images2video: one per CPU.
+    """
+    if jobs == 1 or job_count <= 1:
+        return None
+    cpus = os.cpu_count() or 1
+    processes = min(jobs or cpus, job_count)
+    return max(1, cpus // processes)
+
+def decode_file(input_path, output_path, jobs=None):
+    """
+    Decodes one video or WAV file (picked by extension) into output_path, streaming the data.
+    Returns a dict: input, output, bytes written, elapsed seconds and throughput in MB/s.
+    """
+    if input_path.lower().endswith(AUDIO_EXTENSIONS):
+        chunks = iter_decoded_audio(input_path)
+    else:
+        chunks = iter_decoded_video(input_path, jobs)
+    size = 0
+    start = time.perf_counter()
+    with open(output_path, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    return {
+        "input": input_path,
+        "output": output_path,
+        "bytes": size,
+        "elapsed": round(elapsed, 6),
+        "mb_per_second": round(size / 1e6 / elapsed, 3) if elapsed else None,
+        "input_mb_per_second": round(os.path.getsize(input_path) / 1e6 / elapsed, 3) if elapsed else None,
+    }
+
+def format_throughput(result):
+    return (f"{result['input']} -> {result['output']}: {result['bytes']} bytes in {result['elapsed']:.3f} s "
+            f"({result['mb_per_second']} MB/s of data, {result['input_mb_per_second']} MB/s of input)")
+
+def output_paths(args, extension):
+    """The output file for each input: --output for a single input, else <input><extension> (in --output-dir if given)."""
+    if args.output:
+        if len(args.inputs) > 1:
+            sys.exit("--output takes a single input; use --output-dir for several")
+        return [args.output]
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    paths = []
+    for input_path in args.inputs:
+        name = os.path.basename(os.path.normpath(input_path)) + extension
+        paths.append(os.path.join(args.output_dir or os.path.dirname(os.path.normpath(input_path)), name))
+    return paths
+
+def image_files(directory):
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+def report(results):
+    """Prints one line per result to stderr. Returns the exit code: 1 if any failed."""
+    failures = 0
+    for result in results:
+        if result["status"] == "ok":
+            print(f"{result['input']} -> {result['output']}: {result['bytes']} bytes in {result['elapsed']:.3f} s "
+                  f"({result['mb_per_second']} MB/s)", file=sys.stderr)
+        else:
+            failures += 1
+            print(f"{result['input']}: failed: {result['error']}", file=sys.stderr)
+    return 1 if failures else 0
+
+def video_command(args):
+    job_list = [(input_path, output_path, args.profile) for input_path, output_path in zip(args.inputs, output_paths(args, ".avi"))]
+    return report(run_jobs(encode_video_job, job_list, args.jobs))
+
+def audio_command(args):
+    job_list = list(zip(args.inputs, output_paths(args, ".wav")))
+    return report(run_jobs(encode_audio_job, job_list, args.jobs))
+
+def images_command(args):
+    if args.output:
+        # One slideshow from every image given (directories contribute their images, sorted by name)
+        image_paths = []
+        for input_path in args.inputs:
+            image_paths.extend(image_files(input_path) if os.path.isdir(input_path) else [input_path])
+        job_list = [(image_paths, args.output, args.duration, args.fps, None)]
+    else:
+        # One slideshow per directory
+        if not all(os.path.isdir(input_path) for input_path in args.inputs):
+            sys.exit("Image files need --output; without it every input must be a directory")
+        paths = output_paths(args, ".avi")
+        workers = threads_per_job(len(paths), args.jobs)
+        job_list = [(image_files(input_path), output_path, args.duration, args.fps, workers)
+                    for input_path, output_path in zip(args.inputs, paths)]
+    return report(run_jobs(images_job, job_list, args.jobs))
+
+def decode_command(args):
+    failures = 0
+    for input_path, output_path in zip(args.inputs, output_paths(args, ".decoded")):
+        try:
+            result = decode_file(input_path, output_path, args.jobs)
+        except Exception as e:
+            failures += 1
+            print(f"{input_path}: decoding failed: {e}", file=sys.stderr)
+            continue
+        print(format_throughput(result), file=sys.stderr)
+    return 1 if failures else 0
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Convert data to and from File2video/File2audio media without a display.")
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+
+    def add_common(parser, inputs_help, output_help, jobs_help):
+        parser.add_argument("inputs", nargs="+", help=inputs_help)
+        parser.add_argument("-o", "--output", default=None, help=output_help)
+        parser.add_argument("--output-dir", default=None, help="directory for the outputs (default: next to each input)")
+        parser.add_argument("-j", "--jobs", type=int, default=None, help=jobs_help)
+
+    video_parser = subparsers.add_parser("video", help="encode files as videos (<input>.avi)")
+    add_common(video_parser, "files to encode", "output video (single input only)",
+               "worker processes (default: CPU count, 1 runs in-process)")
+    video_parser.add_argument("-p", "--profile", choices=sorted(PROFILES), default="classic", help="encoding profile (default: classic)")
+    video_parser.set_defaults(handler=video_command)
+
+    audio_parser = subparsers.add_parser("audio", help="encode files as WAV files (<input>.wav)")
+    add_common(audio_parser, "files to encode", "output WAV file (single input only)",
+               "worker processes (default: CPU count, 1 runs in-process)")
+    audio_parser.set_defaults(handler=audio_command)
+
+    images_parser = subparsers.add_parser("images", help="make slideshow videos from images")
+    add_common(images_parser, "image directories (one video each), or images/directories for a single --output video",
+               "one video from all the inputs", "worker processes (default: CPU count, 1 runs in-process)")
+    images_parser.add_argument("-d", "--duration", type=float, default=DEFAULT_DURATION, help="seconds per image")
+    images_parser.add_argument("--fps", type=float, default=VIDEO_FPS, help="video frame rate")
+    images_parser.set_defaults(handler=images_command)
+
+    decode_parser = subparsers.add_parser("decode", help="recover the data in videos (.avi) and audio files (.wav)")
+    add_common(decode_parser, "encoded videos or WAV files", "output file (single input only)",
+               "video decoding processes (default: CPU count, 1 decodes in-process)")
+    decode_parser.set_defaults(handler=decode_command)
+
+    args = arg_parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
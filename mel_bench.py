@@ -0,0 +1,96 @@
+import sys
+import time
+
+from MEL import Interpreter, parse_mel
+
+# --- Helpers ---
+
+def binary_literal(n):
+    """Encodes a non-negative integer as a MEL multi-bit binary literal (;;$$$$$$$$;$$$$$$$...)."""
+    bits = bin(n)[2:]
+    return ';;' + ';'.join('$$$$$$$$' if b == '1' else '$$$$$$$' for b in bits)
+
+def time_interpret(ast, repeats=3):
+    """Interprets the AST `repeats` times on fresh interpreters, returns the best time in seconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        interpreter = Interpreter()
+        start = time.perf_counter()
+        interpreter.interpret(ast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# --- Benchmarks ---
+
+def call_program(calls):
+    """A loop that does nothing but call a one-line function `calls` times."""
+    return f"""
+::: Program start
+-> inc x
+^ x $+ $$$$$$$$
+i = $$$$$$
+@ i $< {binary_literal(calls)}
+    i = ->> inc i
+!@!
+;;; Program end
+"""
+
+def loop_program(iterations):
+    """The same loop with the call inlined, used to subtract the loop cost."""
+    return f"""
+::: Program start
+i = $$$$$$
+@ i $< {binary_literal(iterations)}
+    i = i $+ $$$$$$$$
+!@!
+;;; Program end
+"""
+
+class _Unwind(Exception):
+    """Reference exception, shaped like the old ReturnValue."""
+    def __init__(self, value):
+        self.value = value
+
+def unwind_exception(n):
+    """Reference: returning through raise/except, as MEL function calls used to."""
+    def ret(v):
+        raise _Unwind(v)
+    start = time.perf_counter()
+    for i in range(n):
+        try:
+            ret(i)
+        except _Unwind as rv:
+            rv.value
+    return time.perf_counter() - start
+
+def unwind_flag(n):
+    """Reference: returning through a completion flag, as MEL function calls do now."""
+    class State:
+        pending = False
+        value = None
+    state = State()
+    def ret(v):
+        state.value = v
+        state.pending = True
+    start = time.perf_counter()
+    for i in range(n):
+        ret(i)
+        if state.pending:
+            state.value
+            state.pending = False
+    return time.perf_counter() - start
+
+def main(calls=20000):
+    call_time = time_interpret(parse_mel(call_program(calls)))
+    loop_time = time_interpret(parse_mel(loop_program(calls)))
+    per_call = (call_time - loop_time) / calls
+    print(f"MEL function calls: {calls} calls in {call_time:.3f}s "
+          f"(loop alone {loop_time:.3f}s, ~{per_call * 1e6:.2f} us per call)")
+
+    exc_time = unwind_exception(calls * 10)
+    flag_time = unwind_flag(calls * 10)
+    print(f"Return unwinding x{calls * 10}: exception {exc_time:.3f}s, "
+          f"completion flag {flag_time:.3f}s ({exc_time / flag_time:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,211 @@
+import argparse
+import io
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from MEL import Interpreter, MELRuntimeError, parse_mel
+
+# --- Headless MEL runner ---
+# Runs MEL programs without touching the console: output is captured per program,
+# every program gets a wall-clock and/or CPU time limit, and a batch is spread over
+# a process pool so one endless loop only stalls its own worker.
+# The limits are interval timers, whose signals Python only handles between bytecodes,
+# so they're best-effort: a single long C call (a huge `$!`, say) doesn't notice them.
+# A pooled batch therefore also has a hard backstop: a program still running
+# HARD_LIMIT_GRACE seconds past its limit gets its worker killed (with the rest of the
+# pool), is reported as a timeout, and the batch carries on in a fresh pool.
+HARD_LIMIT_GRACE = 5.0
+BACKSTOP_POLL_INTERVAL = 0.1 # Seconds between checks on the program the batch is waiting for
+
+class MELTimeout(BaseException):
+    """
+    Raised inside a running program when it hits its time limit.
+    Derives from BaseException so MEL's try/catch (which catches Exception) can't swallow it.
+    """
+    pass
+
+def _raise_timeout(signum, frame):
+    kind = "CPU time" if signum == getattr(signal, 'SIGPROF', None) else "time"
+    raise MELTimeout(f"Program exceeded its {kind} limit")
+
+def _set_limits(timeout, cpu_limit):
+    """Arms the interval timers. Returns False if limits can't be enforced here (no signals, not the main thread)."""
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        return False
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    if cpu_limit:
+        signal.signal(signal.SIGPROF, _raise_timeout)
+        signal.setitimer(signal.ITIMER_PROF, cpu_limit)
+    return True
+
+def _clear_limits():
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    signal.setitimer(signal.ITIMER_PROF, 0)
+
+def run_program(source, name=None, timeout=None, cpu_limit=None, stdin_text=""):
+    """
+    Parses and runs one MEL program with its output captured.
+    Returns a dict: name, status ('ok', 'error' or 'timeout'), output, error and elapsed seconds.
+    Limits are only enforced on POSIX, in the main thread of a process.
+    """
+    output = io.StringIO()
+    status, error = "ok", None
+    previous_stdin, previous_stdout = sys.stdin, sys.stdout
+    # '<' reads stdin and prompts on stdout; keep both away from the real console
+    sys.stdin, sys.stdout = io.StringIO(stdin_text), output
+    limited = _set_limits(timeout, cpu_limit)
+    start = time.perf_counter()
+    try:
+        Interpreter(output).interpret(parse_mel(source))
+    except MELTimeout as e:
+        status, error = "timeout", str(e)
+    except MELRuntimeError as e:
+        status, error = "error", f"MEL Runtime Error: {e}"
+    except Exception as e:
+        status, error = "error", f"Internal Interpreter Error: {e}"
+    finally:
+        elapsed = time.perf_counter() - start
+        if limited:
+            _clear_limits()
+        sys.stdin, sys.stdout = previous_stdin, previous_stdout
+    return {
+        "name": name,
+        "status": status,
+        "output": output.getvalue(),
+        "error": error,
+        "elapsed": round(elapsed, 6),
+    }
+
+def _run_program_job(job):
+    """Process pool entry point: job is (name, source, timeout, cpu_limit)."""
+    name, source, timeout, cpu_limit = job
+    return run_program(source, name, timeout, cpu_limit)
+
+def run_batch(programs, jobs=None, timeout=None, cpu_limit=None, chunksize=16):
+    """
+    Runs many MEL programs across a process pool.
+    programs is an iterable of (name, source) pairs; results are yielded in the same order.
+    With a limit, programs that ignore it are stopped by the hard backstop (see above);
+    chunksize only applies to unlimited batches.
+    """
+    job_list = ((name, source, timeout, cpu_limit) for name, source in programs)
+    if jobs == 1:
+        # No pool: handy for debugging, and still honours the limits (but has no backstop)
+        yield from map(_run_program_job, job_list)
+        return
+    if timeout or cpu_limit:
+        # CPU time can't run ahead of wall time, but may lag it on a busy machine
+        hard_limit = (timeout if timeout else 2 * cpu_limit) + HARD_LIMIT_GRACE
+        yield from _run_with_backstop(job_list, jobs or os.cpu_count() or 1, hard_limit)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_run_program_job, job_list, chunksize=chunksize)
+
+def _terminate_pool(executor):
+    """Kills the pool's worker processes (busy or not) and shuts it down."""
+    for process in list((executor._processes or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+def _run_with_backstop(job_iter, workers, hard_limit):
+    """
+    Yields job results in order, keeping 2 jobs per worker queued. A job that has been
+    running for hard_limit seconds while the batch waits for it is killed with its pool;
+    the unfinished jobs queued behind it are resubmitted to a new pool.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque() # (job, future), in batch order
+    try:
+        while True:
+            while len(pending) < 2 * workers:
+                job = next(job_iter, None)
+                if job is None:
+                    break
+                pending.append((job, executor.submit(_run_program_job, job)))
+            if not pending:
+                return
+            job, future = pending[0]
+            result = None
+            running_since = None
+            while result is None:
+                try:
+                    result = future.result(timeout=BACKSTOP_POLL_INTERVAL)
+                except FutureTimeout:
+                    if not future.running():
+                        continue
+                    now = time.perf_counter()
+                    running_since = running_since or now
+                    if now - running_since >= hard_limit:
+                        break
+            pending.popleft()
+            if result is None:
+                _terminate_pool(executor)
+                result = {
+                    "name": job[0],
+                    "status": "timeout",
+                    "output": "",
+                    "error": f"Program ignored its limit; its worker was killed after {hard_limit} s",
+                    "elapsed": round(time.perf_counter() - running_since, 6),
+                }
+                executor = ProcessPoolExecutor(max_workers=workers)
+                # Jobs that finished before the kill keep their results; the rest run again
+                pending = deque((queued_job, queued_future if queued_future.done() and not queued_future.exception()
+                                 else executor.submit(_run_program_job, queued_job))
+                                for queued_job, queued_future in pending)
+            yield result
+    finally:
+        if pending:
+            _terminate_pool(executor) # Stopped early: don't wait for programs nobody will read
+        else:
+            executor.shutdown()
+
+def iter_program_files(paths, extension=".mel"):
+    """Expands files and directories (searched recursively for *.mel) into (path, source) pairs."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename.endswith(extension):
+                        file_path = os.path.join(root, filename)
+                        with open(file_path, "r", encoding="utf-8") as f:
+                            yield file_path, f.read()
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield path, f.read()
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run MEL programs headlessly and report results as JSON lines.")
+    arg_parser.add_argument("paths", nargs="+", help="MEL files, or directories to search for *.mel files")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count, 1 runs in-process)")
+    arg_parser.add_argument("-t", "--timeout", type=float, default=10.0,
+                            help="wall-clock limit per program in seconds (0 disables); with a pool, a program that can't "
+                                 "be interrupted is killed HARD_LIMIT_GRACE seconds later")
+    arg_parser.add_argument("--cpu-limit", type=float, default=None,
+                            help="CPU time limit per program in seconds (best-effort, like --timeout: see HARD_LIMIT_GRACE)")
+    arg_parser.add_argument("-o", "--output", default=None, help="write JSON lines here instead of stdout")
+    args = arg_parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {"ok": 0, "error": 0, "timeout": 0}
+    try:
+        for result in run_batch(iter_program_files(args.paths), args.jobs, args.timeout or None, args.cpu_limit):
+            counts[result["status"]] += 1
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{sum(counts.values())} programs: {counts['ok']} ok, {counts['error']} errors, "
+          f"{counts['timeout']} timeouts", file=sys.stderr)
+    return 0 if counts["ok"] == sum(counts.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+import INM
+
+
+def test_replacing_a_builtin_after_its_call_site_was_compiled():
+    original = INM.builtins['len']
+    try:
+        assert INM.evaluate_expression(['len', 'abc']) == 3 # Compiles and caches the call site
+        INM.builtins['len'] = lambda s=None: 42
+        assert INM.evaluate_expression(['len', 'abc']) == 42
+    finally:
+        INM.register_builtin('len', original, 0, 1, ('string',))
+    assert INM.evaluate_expression(['len', 'abc']) == 3
+
+
+def test_replacing_a_builtin_on_an_isolated_interpreter():
+    interpreter = INM.InmInterpreter()
+    assert interpreter.evaluate(['upper', 'abc']) == "ABC"
+    interpreter.builtins['upper'] = lambda s=None: "replaced"
+    assert interpreter.evaluate(['upper', 'abc']) == "replaced"
+    assert INM.evaluate_expression(['upper', 'abc']) == "ABC" # The module's builtins are untouched
+
+
+def test_removing_a_builtin_after_its_call_site_was_compiled():
+    INM.builtins['hello'] = lambda: "hi"
+    try:
+        assert INM.evaluate_expression(['hello']) == "hi"
+    finally:
+        del INM.builtins['hello']
+        INM.builtin_table.pop('hello', None)
+    assert INM.evaluate_expression(['hello']) == "hello" # Back to a plain string